@@ -86,6 +86,13 @@ import streamlit as st
 import pandas as pd
 from utils import ui 
 from streamlit_lottie import st_lottie
+from src.ingestion import StreamingIngestor
+from src.dataset_cache import DatasetCache
+from src.data_processor import DataProcessor
+from src.excel_reader import list_sheets, excel_header
+from src.running_stats import DatasetStats
+from src.rollup import RollupCube
+from src.row_index import RowHashIndex
 
 # 1. Config (Tab Title & Icon)
 st.set_page_config(page_title="ORBIT", layout="wide", page_icon="favicon.svg")
@@ -119,8 +126,9 @@ with col_text:
     # State Management
     if "df" not in st.session_state:
         st.session_state.df = None
+        st.session_state.ingest_stats = None
 
-    uploaded_file = st.file_uploader("📂 Upload Enterprise Data (CSV)", type=["csv"])
+    uploaded_file = st.file_uploader("📂 Upload Enterprise Data (CSV / Excel)", type=["csv", "xlsx"])
 
 with col_anim:
     lottie_orbit = ui.load_lottie_url("https://assets3.lottiefiles.com/packages/lf20_w51pcehl.json")
@@ -133,14 +141,118 @@ st.divider()
 
 if uploaded_file:
     try:
-        if uploaded_file.size > 200 * 1024 * 1024:
-            st.warning("⚠️ Large file detected. Auto-sampling 10k rows.")
-            df = pd.read_csv(uploaded_file, nrows=10000)
+        is_excel = uploaded_file.name.lower().endswith(".xlsx")
+        # xlsx is zip-compressed, so the same row count arrives in roughly a tenth of the bytes
+        is_large = uploaded_file.size > (20 if is_excel else 200) * 1024 * 1024
+        stratify_by = None
+        sheet_name = None
+
+        if is_excel:
+            sheets = list_sheets(uploaded_file)
+            sheet_name = st.selectbox("📑 Worksheet", sheets) if len(sheets) > 1 else sheets[0]
+
+        if is_large:
+            # Optional stratification keeps every Region/Product represented in the sample
+            if is_excel:
+                header = excel_header(uploaded_file, sheet_name)
+            else:
+                header = pd.read_csv(uploaded_file, nrows=0).columns.tolist()
+            uploaded_file.seek(0)
+            choice = st.selectbox("🎯 Stratify working sample by", ["None (uniform)"] + header)
+            stratify_by = None if choice == "None (uniform)" else choice
+
+        optimize = st.toggle("⚡ Optimise memory (categories, downcast numbers, parse dates)", value=False)
+
+        # Only (re)ingest when a different file or sampling choice is made, not on every rerun
+        upload_key = (uploaded_file.name, uploaded_file.size, sheet_name, stratify_by, optimize)
+        if st.session_state.get("upload_key") != upload_key:
+            # Known files (same bytes) load from the columnar cache instead of being re-parsed
+            dataset_cache = DatasetCache()
+
+            if is_large:
+                content_key = dataset_cache.content_key(uploaded_file)
+                variant = f"sample-{sheet_name or 'csv'}-{stratify_by or 'uniform'}"
+                df = dataset_cache.get(content_key, variant)
+                dataset_stats = dataset_cache.get_meta(content_key, f"stats-{variant}", DatasetStats)
+                rollup = dataset_cache.get_meta(content_key, f"rollup-{variant}", RollupCube)
+
+                if df is None or dataset_stats is None or rollup is None:
+                    # Stream the whole file: exact totals for every row, representative sample in RAM
+                    st.warning("⚠️ Large file detected. Streaming full file, keeping a 10k-row representative sample.")
+                    progress_bar = st.progress(0.0, text="Streaming records...")
+                    ingestor = StreamingIngestor(sample_rows=10000, stratify_by=stratify_by)
+                    df, _ = ingestor.ingest(
+                        uploaded_file,
+                        progress_callback=lambda p: progress_bar.progress(p, text=f"Streaming records... {p:.0%}"),
+                        file_format="xlsx" if is_excel else "csv",
+                        sheet_name=sheet_name
+                    )
+                    progress_bar.empty()
+                    dataset_stats = ingestor.stats
+                    rollup = ingestor.rollup
+                    dataset_cache.put(content_key, df, variant)
+                    dataset_cache.put_meta(content_key, dataset_stats, f"stats-{variant}")
+                    dataset_cache.put_meta(content_key, rollup, f"rollup-{variant}")
+
+                ingest_stats = dataset_stats.to_dict()
+                ingest_stats["sample_rows"] = len(df)
+            elif is_excel:
+                df = DataProcessor(cache=dataset_cache).load_data(uploaded_file, file_format="xlsx", sheet_name=sheet_name)
+                ingest_stats = None
+            else:
+                df = dataset_cache.load_csv(uploaded_file)
+                ingest_stats = None
+
+            st.session_state.memory_report = None
+            if optimize:
+                processor = DataProcessor()
+                processor.data = df
+                df = processor.optimize_dtypes()
+                st.session_state.memory_report = processor.memory_report
+
+            # Mergeable aggregates: later cleaning/appends adjust them in O(changed rows) instead of rescanning
+            if ingest_stats is None:
+                dataset_stats = DatasetStats.from_frame(df)
+                rollup = RollupCube.from_frame(df)
+
+            # A new version of the same table (e.g. next month's export): rows added/removed, from row hashes alone
+            st.session_state.version_diff = None
+            previous = st.session_state.get("df")
+            if (previous is not None and ingest_stats is None and not st.session_state.get("ingest_stats")
+                    and previous.columns.equals(df.columns) and previous.dtypes.equals(df.dtypes)):
+                try:
+                    changes = RowHashIndex.from_frame(df).diff(RowHashIndex.from_frame(previous))
+                    st.session_state.version_diff = {key: len(rows) for key, rows in changes.items()}
+                except TypeError: #unhashable cells
+                    pass
+
+            # Derived structures (rollup cube, ...) are tied to a dataset version and rebuilt only when it changes
+            st.session_state.dataset_version = st.session_state.get("dataset_version", 0) + 1
+            st.session_state.df = df
+            st.session_state.ingest_stats = ingest_stats
+            st.session_state.dataset_stats = dataset_stats
+            st.session_state.rollup = rollup
+            st.session_state.rollup_version = st.session_state.dataset_version
+            st.session_state.upload_key = upload_key
+            st.session_state.upload = uploaded_file if is_large and not is_excel else None #kept for full-file (out-of-core CSV) jobs
+
+        df = st.session_state.df
+        ingest_stats = st.session_state.ingest_stats
+
+        if ingest_stats:
+            st.success(f"✅ Orbit Established: {ingest_stats['rows']:,} records scanned, {len(df):,}-row working sample ready for analysis.")
         else:
-            df = pd.read_csv(uploaded_file)
+            st.success(f"✅ Orbit Established: {len(df):,} records ready for analysis.")
+
+        version_diff = st.session_state.get("version_diff")
+        if version_diff:
+            st.caption(f"🔁 Compared with the previous upload: +{version_diff['added']:,} new rows, "
+                       f"−{version_diff['removed']:,} rows no longer present.")
 
-        st.session_state.df = df
-        st.success(f"✅ Orbit Established: {len(df):,} records ready for analysis.")
+        memory_report = st.session_state.get("memory_report")
+        if memory_report:
+            st.caption(f"⚡ Memory: {memory_report['before (MB)']:,.1f} MB → {memory_report['after (MB)']:,.1f} MB "
+                       f"(-{memory_report['reduction (%)']:.0f}%)")
         
         st.markdown("### 🚀 Launch Module")
         c1, c2, c3 = st.columns(3)
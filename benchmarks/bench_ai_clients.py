@@ -0,0 +1,136 @@
+"""
+Module: bench_ai_clients.py
+Purpose: Measure the connection-setup cost saved by the pooled inference clients in utils.ai_helper
+
+A local mock chat-completion endpoint stands in for the Hugging Face API, so the numbers isolate client
+construction and TCP setup from model latency (the real API adds a TLS handshake per new connection on
+top, so these savings are a lower bound).
+
+Usage:
+    python benchmarks/bench_ai_clients.py                        # 200 calls, 1 thread
+    python benchmarks/bench_ai_clients.py --calls 500 --threads 8
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+import statistics
+import http.client
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Any
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(ROOT)
+
+COMPLETION = {
+    "id": "mock", "object": "chat.completion", "created": 0, "model": "mock", "system_fingerprint": "mock",
+    "choices": [{"index": 0, "finish_reason": "stop", "logprobs": None,
+                 "message": {"role": "assistant", "content": "1. Grow the North region."}}],
+    "usage": {"prompt_tokens": 10, "completion_tokens": 8, "total_tokens": 18}
+}
+
+class MockHandler(BaseHTTPRequestHandler):
+    """OpenAI-style /v1/chat/completions endpoint over HTTP/1.1 keep-alive; counts accepted connections"""
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True #headers and body go out in separate writes
+    connections = 0
+    lock = threading.Lock()
+
+    def setup(self):
+        with MockHandler.lock:
+            MockHandler.connections += 1
+        super().setup()
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        body = json.dumps(COMPLETION).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+def run(name:str, call:Callable[[], Any], calls:int, threads:int) -> Dict[str, Any]:
+    """Time `calls` invocations spread over `threads` and report latency plus connections opened"""
+
+    def timed(_):
+        start = time.perf_counter()
+        call()
+        return time.perf_counter() - start
+
+    MockHandler.connections = 0
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        latencies = list(pool.map(timed, range(calls)))
+    total = time.perf_counter() - start
+
+    latencies.sort()
+    result = {
+        "name": name,
+        "total_s": round(total, 3),
+        "p50_ms": round(statistics.median(latencies) * 1e3, 2),
+        "p95_ms": round(latencies[int(0.95 * (len(latencies) - 1))] * 1e3, 2),
+        "connections": MockHandler.connections
+    }
+    print(f"{name:<28} total {result['total_s']:>7.3f}s   p50 {result['p50_ms']:>7.2f} ms   "
+          f"p95 {result['p95_ms']:>7.2f} ms   connections {result['connections']}")
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--threads", type=int, default=1)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), MockHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host, port = server.server_address
+    url = f"http://{host}:{port}"
+    payload = json.dumps({"model": "mock", "messages": [{"role": "user", "content": "hi"}], "max_tokens": 150})
+
+    # 1. Transport only: what a fresh connection per request costs
+    local = threading.local()
+
+    def fresh_connection():
+        conn = http.client.HTTPConnection(host, port)
+        conn.request("POST", "/v1/chat/completions", payload, {"Content-Type": "application/json"})
+        conn.getresponse().read()
+        conn.close()
+
+    def kept_alive():
+        if not hasattr(local, "conn"):
+            local.conn = http.client.HTTPConnection(host, port)
+        local.conn.request("POST", "/v1/chat/completions", payload, {"Content-Type": "application/json"})
+        local.conn.getresponse().read()
+
+    print(f"mock endpoint {url}, {args.calls} calls on {args.threads} thread(s)\n")
+    run("http: new connection", fresh_connection, args.calls, args.threads)
+    run("http: keep-alive", kept_alive, args.calls, args.threads)
+
+    # 2. The real client path: the old per-call InferenceClient versus the pooled one
+    try:
+        from huggingface_hub import InferenceClient
+        from utils import ai_helper
+    except ImportError as e:
+        print(f"\nskipping client benchmark ({e})")
+        server.shutdown()
+        return
+
+    messages = [{"role": "user", "content": "hi"}]
+    print()
+    run("client: new per call", lambda: InferenceClient(model=url, token=None).chat_completion(messages, max_tokens=150),
+        args.calls, args.threads)
+    run("client: pooled (ai_helper)", lambda: ai_helper.get_client(url).chat_completion(messages, max_tokens=150),
+        args.calls, args.threads)
+    server.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,244 @@
+"""
+Module: run_benchmarks.py
+Purpose: Reproducible end-to-end timing and peak-memory benchmarks for the ORBIT data pipeline
+
+Usage:
+    python benchmarks/run_benchmarks.py                      # 10 MB and 100 MB, compare with baseline
+    python benchmarks/run_benchmarks.py --sizes 10 100 1000  # include the 1 GB dataset
+    python benchmarks/run_benchmarks.py --save-baseline      # accept the current numbers as the baseline
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import statistics
+import subprocess
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, Optional
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(ROOT)
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(BENCH_DIR, "data")
+RESULTS_PATH = os.path.join(BENCH_DIR, "results", "latest.json")
+BASELINE_PATH = os.path.join(BENCH_DIR, "baseline.json")
+
+SEED = 2024
+STAGES = [
+    "load_data",
+    "clean_data",
+    "get_info",
+    "get_summary",
+    "calculate_key_metrics",
+    "find_first_anomaly",
+    "scan_anomalies",
+    "correlation",
+]
+
+def _peak_rss_mb(children:bool = False) -> Optional[float]:
+    """
+    Peak resident set size of the current process in MB (None where unsupported). With children=True,
+    the peak of the largest terminated child instead, e.g. a parallel parser worker.
+    """
+
+    try:
+        import resource
+    except ImportError:
+        return None
+
+    peak = resource.getrusage(resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024**2 if sys.platform == "darwin" else peak / 1024 #bytes on macOS, KB on Linux
+
+def _setup(stage:str, csv_path:str):
+    """Prepare the untimed inputs a stage needs"""
+
+    from src.data_processor import DataProcessor
+
+    processor = DataProcessor()
+    if stage != "load_data":
+        processor.load_data(csv_path, parallel=False) #no worker processes before the timed stage, so child RSS is the stage's own
+    return processor
+
+def _run(stage:str, processor, csv_path:str):
+    """Execute one stage on prepared inputs"""
+
+    from src.analyzer import DataAnalyzer
+    from src.correlation import CorrelationAccumulator
+    from utils import math_utils
+
+    if stage == "load_data":
+        return processor.load_data(csv_path)
+    if stage == "clean_data":
+        return processor.clean_data()
+    if stage == "get_info":
+        return processor.get_info()
+    if stage == "get_summary":
+        return DataAnalyzer(processor.data).get_summary()
+    if stage == "calculate_key_metrics":
+        return math_utils.calculate_key_metrics(processor.data)
+    if stage == "find_first_anomaly":
+        return math_utils.find_first_anomaly(processor.data)
+    if stage == "scan_anomalies":
+        return math_utils.scan_anomalies(processor.data, top_k=10, method="robust")
+    if stage == "correlation":
+        return CorrelationAccumulator.from_frame(processor.data).corr()
+    raise ValueError(f"Unknown stage: {stage}")
+
+def _measure(stage:str, csv_path:str) -> Dict[str, Any]:
+    """
+    Time one stage inside a fresh worker process so its peak RSS is not polluted by other stages.
+    Stages that fan out to processes (the parallel CSV parser) also use memory outside this process:
+    peak_rss_mb adds the largest child's peak, a lower bound when several children ran at once.
+    """
+
+    import io
+    import contextlib
+
+    with contextlib.redirect_stdout(io.StringIO()): #the pipeline prints progress lines we do not want in the report
+        processor = _setup(stage, csv_path)
+        rss_before = _peak_rss_mb()
+
+        start = time.perf_counter()
+        _run(stage, processor, csv_path)
+        seconds = time.perf_counter() - start
+
+    rss_after = _peak_rss_mb()
+    children = _peak_rss_mb(children=True)
+    return {
+        "seconds": seconds,
+        "peak_rss_mb": None if rss_after is None else rss_after + children,
+        "children_peak_rss_mb": children,
+        "stage_rss_mb": None if rss_before is None else max(0.0, rss_after - rss_before) + children
+    }
+
+def ensure_dataset(size_mb:int) -> str:
+    """Generate (once) the seeded dataset of a given size"""
+
+    from generate_big_data import generate_csv
+
+    os.makedirs(DATA_DIR, exist_ok=True)
+    path = os.path.join(DATA_DIR, f"orbit_{size_mb}mb_seed{SEED}.csv")
+    if not os.path.exists(path):
+        print(f"Generating {size_mb} MB dataset...")
+        generate_csv(path, size_mb, seed=SEED, verbose=False)
+    return path
+
+def run_benchmarks(sizes, repeats:int) -> Dict[str, Any]:
+    """Benchmark every stage at every dataset size"""
+
+    results = {}
+    context = multiprocessing.get_context("spawn")
+
+    for size_mb in sizes:
+        csv_path = ensure_dataset(size_mb)
+        results[f"{size_mb}mb"] = {}
+
+        for stage in STAGES:
+            runs = []
+            for _ in range(repeats):
+                with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+                    runs.append(pool.submit(_measure, stage, csv_path).result())
+
+            rss = [run["peak_rss_mb"] for run in runs if run["peak_rss_mb"] is not None]
+            stage_rss = [run["stage_rss_mb"] for run in runs if run["stage_rss_mb"] is not None]
+            children_rss = [run["children_peak_rss_mb"] for run in runs if run["children_peak_rss_mb"] is not None]
+            results[f"{size_mb}mb"][stage] = {
+                "seconds_median": statistics.median(run["seconds"] for run in runs),
+                "seconds_min": min(run["seconds"] for run in runs),
+                "peak_rss_mb": max(rss) if rss else None,
+                "stage_rss_mb": max(stage_rss) if stage_rss else None,
+                "children_peak_rss_mb": max(children_rss) if children_rss else None,
+                "repeats": repeats
+            }
+            entry = results[f"{size_mb}mb"][stage]
+            print(f"{size_mb:>5} MB  {stage:<22} {entry['seconds_median']:8.3f}s  peak {entry['peak_rss_mb'] or 0:8.1f} MB"
+                  f"  (children {entry['children_peak_rss_mb'] or 0:.1f} MB)")
+
+    return results
+
+def _environment() -> Dict[str, Any]:
+    """Describe the machine and code version the numbers came from"""
+
+    import numpy
+    import pandas
+
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True).stdout.strip()
+    except OSError:
+        commit = None
+
+    return {
+        "commit": commit,
+        "python": platform.python_version(),
+        "pandas": pandas.__version__,
+        "numpy": numpy.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "seed": SEED,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S")
+    }
+
+def compare(results:Dict[str, Any], baseline:Dict[str, Any], time_tolerance:float, memory_tolerance:float):
+    """List every stage that got slower or hungrier than the baseline beyond the tolerances"""
+
+    regressions = []
+    for size, stages in results.items():
+        for stage, current in stages.items():
+            previous = baseline.get("results", {}).get(size, {}).get(stage)
+            if not previous:
+                continue
+
+            if current["seconds_median"] > previous["seconds_median"] * (1 + time_tolerance):
+                regressions.append(f"{size} {stage}: {previous['seconds_median']:.3f}s -> {current['seconds_median']:.3f}s")
+
+            if current["peak_rss_mb"] and previous.get("peak_rss_mb") and current["peak_rss_mb"] > previous["peak_rss_mb"] * (1 + memory_tolerance):
+                regressions.append(f"{size} {stage}: peak RSS {previous['peak_rss_mb']:.0f} MB -> {current['peak_rss_mb']:.0f} MB")
+
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="ORBIT pipeline benchmarks")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100], help="dataset sizes in MB (e.g. 10 100 1000)")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--time-tolerance", type=float, default=0.20, help="allowed slowdown before flagging, 0.20 = 20%%")
+    parser.add_argument("--memory-tolerance", type=float, default=0.15, help="allowed peak RSS growth before flagging")
+    parser.add_argument("--save-baseline", action="store_true", help="write these results as the new baseline")
+    args = parser.parse_args()
+
+    report = {"environment": _environment(), "results": run_benchmarks(args.sizes, args.repeats)}
+
+    os.makedirs(os.path.dirname(RESULTS_PATH), exist_ok=True)
+    with open(RESULTS_PATH, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {RESULTS_PATH}")
+
+    if args.save_baseline:
+        with open(BASELINE_PATH, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline saved to {BASELINE_PATH}")
+        return 0
+
+    if not os.path.exists(BASELINE_PATH):
+        print("No baseline yet; run with --save-baseline to create one.")
+        return 0
+
+    with open(BASELINE_PATH) as f:
+        baseline = json.load(f)
+
+    regressions = compare(report["results"], baseline, args.time_tolerance, args.memory_tolerance)
+    if regressions:
+        print("\n⚠️ Regressions against baseline:")
+        for line in regressions:
+            print(f"  - {line}")
+        return 1
+
+    print("\n✅ No regressions against baseline.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -7,40 +7,55 @@ FILENAME = "large_test_data.csv"
 TARGET_SIZE_MB = 1000  # 1000 MB = 1 GB
 CHUNK_SIZE = 500_000   # Generate 500k rows at a time to save RAM
 
-def generate_large_csv():
-    print(f"🚀 Starting generation of {TARGET_SIZE_MB}MB file...")
+def generate_csv(filename=FILENAME, target_size_mb=TARGET_SIZE_MB, seed=None, chunk_size=CHUNK_SIZE, verbose=True):
+    """
+    Writes a Date/Region/Product/Sales/Units_Sold/Profit CSV of about target_size_mb.
+    Passing a seed makes the file byte-for-byte reproducible (used by the benchmarks).
+    """
+    if verbose:
+        print(f"🚀 Starting generation of {target_size_mb}MB file...")
+    rng = np.random.default_rng(seed)
     
     # 1. Create a header first
     header = "Date,Region,Product,Sales,Units_Sold,Profit\n"
-    with open(FILENAME, "w") as f:
+    with open(filename, "w") as f:
         f.write(header)
     
     current_size = 0
-    target_bytes = TARGET_SIZE_MB * 1024 * 1024
+    target_bytes = target_size_mb * 1024 * 1024
     
     # 2. Append data in chunks until we hit the target size
     while current_size < target_bytes:
+        # Small targets get a single right-sized chunk instead of overshooting by 500k rows
+        rows = min(chunk_size, max(1000, (target_bytes - current_size) // 40))
+
         # Create random data
         data = {
-            "Date": np.random.choice(pd.date_range('2024-01-01', periods=365), CHUNK_SIZE),
-            "Region": np.random.choice(['North', 'South', 'East', 'West'], CHUNK_SIZE),
-            "Product": np.random.choice(['Laptop', 'Mouse', 'Keyboard', 'Monitor', 'Headphones'], CHUNK_SIZE),
-            "Sales": np.random.randint(100, 5000, CHUNK_SIZE),
-            "Units_Sold": np.random.randint(1, 100, CHUNK_SIZE),
-            "Profit": np.random.uniform(10.0, 500.0, CHUNK_SIZE).round(2)
+            "Date": rng.choice(pd.date_range('2024-01-01', periods=365), rows),
+            "Region": rng.choice(['North', 'South', 'East', 'West'], rows),
+            "Product": rng.choice(['Laptop', 'Mouse', 'Keyboard', 'Monitor', 'Headphones'], rows),
+            "Sales": rng.integers(100, 5000, rows),
+            "Units_Sold": rng.integers(1, 100, rows),
+            "Profit": rng.uniform(10.0, 500.0, rows).round(2)
         }
         
         # Convert to DataFrame
         df = pd.DataFrame(data)
         
         # Append to CSV (mode='a') without header
-        df.to_csv(FILENAME, mode='a', header=False, index=False)
+        df.to_csv(filename, mode='a', header=False, index=False)
         
         # Check size
-        current_size = os.path.getsize(FILENAME)
-        print(f"📊 Current Size: {current_size / (1024*1024):.2f} MB")
+        current_size = os.path.getsize(filename)
+        if verbose:
+            print(f"📊 Current Size: {current_size / (1024*1024):.2f} MB")
 
-    print(f"✅ DONE! File '{FILENAME}' created successfully.")
+    if verbose:
+        print(f"✅ DONE! File '{filename}' created successfully.")
+    return filename
+
+def generate_large_csv():
+    return generate_csv(FILENAME, TARGET_SIZE_MB)
 
 if __name__ == "__main__":
-    generate_large_csv()
\ No newline at end of file
+    generate_large_csv()
@@ -3,24 +3,34 @@ import sys
 import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 from src.data_processor import DataProcessor
+from src.dataset_cache import DatasetCache
 
 def perform_advanced_cleaning(uploaded_file):
     """
     Uses to clean data.
     """
     # Initialize class
-    processor = DataProcessor()
+    processor = DataProcessor(cache=DatasetCache())
     
     # Load and Clean
-    # (save the uploaded file temporarily because code expects a path)
-    temp_path = "temp_upload.csv"
-    with open(temp_path, "wb") as f:
-        f.write(uploaded_file.getbuffer())
-        
-    processor.load_data(temp_path)
+    # (parsed straight from the upload buffer, no shared temp file on disk)
+    processor.load_data(uploaded_file)
     cleaned_df = processor.clean_data()
     
     # Get stats using
     info = processor.get_info()
     
-    return cleaned_df, info
\ No newline at end of file
+    return cleaned_df, info
+
+def perform_out_of_core_cleaning(uploaded_file):
+    """
+    Cleans the full upload without loading it into memory.
+    Returns the path of the cleaned CSV, kept in the dataset cache directory so it is evicted with
+    the other cache entries (None if it could not be written), and the cleaning report.
+    """
+    processor = DataProcessor()
+    cache = DatasetCache()
+
+    output_path = cache.put_file(cache.content_key(uploaded_file), lambda path: processor.clean_file(uploaded_file, path),
+                                 "cleaned", ".csv")
+    return output_path, processor.clean_report
@@ -11,6 +11,9 @@ import datetime
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 from modules import database
 from utils import ui, math_utils, ai_helper
+from src.filter_index import FilterIndex
+from src.rollup import RollupCube
+from src.query_engine import QueryEngine
 
 # 1. SETUP & STYLING
 # st.set_page_config(page_title="Manager Insights", layout="wide")
@@ -34,22 +37,56 @@ if "df" not in st.session_state or st.session_state.df is None:
 df_original = st.session_state.df
 st.sidebar.header("🔍 Filter Data")
 
-categorical_cols = df_original.select_dtypes(include=['object']).columns.tolist()
+# Filter choices come from the per-dataset distinct counts: no ID columns, no unique() scan per rerun
+dataset_stats = st.session_state.get("dataset_stats")
+categorical_cols = df_original.select_dtypes(include=['object', 'category']).columns.tolist()
+if dataset_stats is not None:
+    categorical_cols = [col for col in dataset_stats.category_columns() if col in categorical_cols]
+
+active_filter = None
 if categorical_cols:
     filter_col = st.sidebar.selectbox("Filter by Category", ["All Data"] + categorical_cols)
     
     if filter_col != "All Data":
-        unique_vals = df_original[filter_col].unique()
+        # Row index built once per dataset: option lists and filtered rows without a full scan per rerun
+        filter_index = st.session_state.get("filter_index")
+        if filter_index is None or filter_index.df is not df_original:
+            filter_index = st.session_state.filter_index = FilterIndex(df_original)
+
+        unique_vals = filter_index.values(filter_col)
         selected_val = st.sidebar.selectbox(f"Select {filter_col}", unique_vals)
-        df = df_original[df_original[filter_col] == selected_val]
+        df = filter_index.filter(filter_col, selected_val)
+        active_filter = (filter_col, selected_val)
         st.sidebar.success(f"Active Filter: {len(df)} rows")
     else:
         df = df_original
 else:
     df = df_original
 
+# Rollup cube: per-category totals, so a filter change is a lookup; rebuilt only when the dataset version changes
+rollup = st.session_state.get("rollup")
+if rollup is None or st.session_state.get("rollup_version") != st.session_state.get("dataset_version"):
+    rollup = st.session_state.rollup = RollupCube.from_frame(df_original)
+    st.session_state.rollup_version = st.session_state.get("dataset_version")
+
 # Calculate metrics
-stats = math_utils.calculate_key_metrics(df)
+# Unfiltered metrics come from the maintained aggregates (full file for streamed uploads) instead of a rescan
+ingest_stats = st.session_state.get("ingest_stats")
+full_stats = dataset_stats.to_dict() if dataset_stats is not None and df is df_original else None
+segment_col = categorical_cols[0] if categorical_cols else None #first low-cardinality text column
+use_rollup = active_filter is not None and dataset_stats is not None and rollup.covers(active_filter[0], segment_col)
+if full_stats:
+    stats = math_utils.calculate_key_metrics_from_stats(full_stats)
+    if ingest_stats:
+        st.caption(f"📡 Metrics computed over all {full_stats['rows']:,} streamed records.")
+elif use_rollup:
+    stats = rollup.key_metrics(*active_filter, segment_col)
+    if ingest_stats:
+        st.caption(f"📡 Filtered metrics computed over all {dataset_stats.rows:,} streamed records.")
+else:
+    stats = math_utils.calculate_key_metrics(df, category_cols=dataset_stats.category_columns() if dataset_stats is not None else None)
+    if ingest_stats:
+        st.caption(f"🧪 Filtered metrics estimated from the {len(df_original):,}-row working sample.")
 
 # --- SAFETY CHECK ---
 if stats is None:
@@ -110,8 +147,13 @@ with chart_col1:
 with chart_col2:
     if 'top_column' in stats:
         try:
-            top_col_name = df.select_dtypes(include='object').columns[0]
-            chart_data = df[top_col_name].value_counts().head(5)
+            top_col_name = df.select_dtypes(include=['object', 'category']).columns[0]
+            if full_stats and top_col_name in full_stats["categories"]:
+                chart_data = pd.Series(full_stats["categories"][top_col_name]).head(5)
+            elif use_rollup and rollup.covers(active_filter[0], top_col_name):
+                chart_data = rollup.value_counts(top_col_name, *active_filter).head(5)
+            else:
+                chart_data = df[top_col_name].value_counts().head(5)
             st.bar_chart(chart_data, color="#6c5ce7") # Prism Purple
         except:
             st.info("No categorical data available for chart.")
@@ -125,8 +167,38 @@ st.markdown("### ⚡ Instant AI Analysis")
 b_col1, b_col2, b_col3 = st.columns(3, gap="medium")
 
 @st.cache_data(show_spinner=False)
-def fast_ai_insight(prompt):
-    return ai_helper.get_llm_response(prompt)
+def cached_insight(prompt, _answer=None):
+    """Finished answers by prompt; a lookup miss raises (exceptions are not cached) so the caller streams it"""
+    if _answer is None:
+        raise LookupError(prompt)
+    return _answer
+
+def stream_insight(title, prompt, placeholder=None):
+    """
+    Render the AI answer into a text card as it is generated (from cache if seen before).
+    Returns the full answer and the seconds until the first words appeared.
+    """
+    t_start = time.perf_counter()
+    try:
+        res = cached_insight(prompt)
+        if placeholder is not None:
+            placeholder.empty()
+        ui.text_card(title, res)
+        return res, time.perf_counter() - t_start
+    except LookupError:
+        pass
+
+    first_token = []
+    def timed(chunks):
+        for chunk in chunks:
+            if not first_token:
+                first_token.append(time.perf_counter() - t_start)
+            yield chunk
+
+    res = ui.stream_text_card(title, timed(ai_helper.stream_llm_response(prompt)), placeholder)
+    if res != ai_helper.FALLBACK_MESSAGE and not res.endswith(ai_helper.INTERRUPTED_SUFFIX): # only complete answers
+        cached_insight(prompt, _answer=res)
+    return res, first_token[0] if first_token else time.perf_counter() - t_start
 
 # --- BUTTON 1: TRENDS ---
 with b_col1:
@@ -138,13 +210,11 @@ with b_col1:
             
         t_start = time.perf_counter()
         prompt = f"Analyze these stats: {formatted_stats}. Write 3 professional bullet points on market trends."
-        res = fast_ai_insight(prompt)
-        
-        # Clear & Show
-        placeholder.empty()
+
+        # Skeleton is replaced by the first words, then the card fills in
+        res, ttft = stream_insight("Market Trends", prompt, placeholder)
         database.save_log("Summarize Trends", "Manager")
-        ui.text_card("Market Trends", res)
-        st.caption(f"⚡ Generated in {time.perf_counter() - t_start:.2f}s")
+        st.caption(f"⚡ First words in {ttft:.2f}s · complete in {time.perf_counter() - t_start:.2f}s")
 
 # HERE: Provide your answer in concise points.
 # --- BUTTON 2: ANOMALIES ---
@@ -156,12 +226,9 @@ with b_col2:
             
         t_start = time.perf_counter()
         prompt = f"Check these stats for outliers: {formatted_stats}. Be brief and professional. Provide your answer in concise points."
-        res = fast_ai_insight(prompt)
-        
-        placeholder.empty()
+        res, ttft = stream_insight("Anomalies Detected", prompt, placeholder)
         database.save_log("Identify Anomalies", "Manager")
-        ui.text_card("Anomalies Detected", res)
-        st.caption(f"⚡ Generated in {time.perf_counter() - t_start:.2f}s")
+        st.caption(f"⚡ First words in {ttft:.2f}s · complete in {time.perf_counter() - t_start:.2f}s")
 
 # --- BUTTON 3: ACTIONS ---
 with b_col3:
@@ -172,12 +239,19 @@ with b_col3:
             
         t_start = time.perf_counter()
         prompt = f"Based on {formatted_stats}, suggest 3 concrete business actions to improve revenue."
-        res = fast_ai_insight(prompt)
-        
-        placeholder.empty()
+        res, ttft = stream_insight("Recommended Actions", prompt, placeholder)
         database.save_log("Suggest Actions", "Manager")
-        ui.text_card("Recommended Actions", res)
-        st.caption(f"⚡ Generated in {time.perf_counter() - t_start:.2f}s")
+        st.caption(f"⚡ First words in {ttft:.2f}s · complete in {time.perf_counter() - t_start:.2f}s")
+
+# Why a model was tried first or skipped (rolling latency, error rate, circuit breaker)
+with st.expander("🩺 AI Model Health"):
+    health = pd.DataFrame(ai_helper.ROUTER.snapshot())
+    histogram = pd.DataFrame(list(health.pop("latency_histogram")))
+    st.dataframe(pd.concat([health, histogram], axis=1), use_container_width=True, hide_index=True)
+    if ai_helper.CACHE is not None:
+        cache_stats = ai_helper.CACHE.stats()
+        st.caption(f"💾 Response cache: {cache_stats['entries']} answers · {cache_stats['hits']} hits / "
+                   f"{cache_stats['misses']} misses ({cache_stats['hit_rate']:.0%} hit rate, all workers)")
 
 # =========================================================
 # ADVANCED TOOLS
@@ -191,8 +265,40 @@ col_innov_1, col_innov_2 = st.columns([1, 1])
 #     audio_value = st.audio_input("Record strategic instruction")
 #     if audio_value and st.button("Process Audio"):
 #         with st.spinner("Processing Voice Instruction..."):
-#             res = fast_ai_insight(f"User voice input regarding {formatted_stats}")
-#             ui.text_card("Voice Analysis Result", res)
+#             res, _ = stream_insight("Voice Analysis Result", f"User voice input regarding {formatted_stats}")
+
+with col_innov_1:
+    st.info("💬 **Ask ORBIT**")
+    # A form, so reruns from other widgets don't re-answer (and re-log) the question still in the box
+    with st.form("ask_orbit"):
+        question = st.text_input("Ask a question about the data", placeholder="e.g. total Sales by Region, top 5 products by Units_Sold")
+        asked = st.form_submit_button("Ask ORBIT", use_container_width=True)
+    if asked and question.strip():
+        # One engine (and result cache) per dataset version and filter. Unfiltered, totals come from the
+        # full-file aggregates (all streamed rows); anything computed on the working sample is labelled as such.
+        engine_key = (st.session_state.get("dataset_version"), active_filter)
+        if st.session_state.get("query_engine_key") != engine_key:
+            unfiltered = df is df_original
+            st.session_state.query_engine = QueryEngine(
+                df,
+                rollup=rollup if unfiltered else None,
+                stats=dataset_stats if unfiltered else None,
+                filter_index=st.session_state.get("filter_index") if unfiltered else None,
+                sample_of=dataset_stats.rows if ingest_stats and dataset_stats is not None else None
+            )
+            st.session_state.query_engine_key = engine_key
+
+        t_start = time.perf_counter()
+        response = st.session_state.query_engine.answer(question)
+        if response is not None:
+            ui.text_card("Answer", response["answer"])
+            st.caption(f"⚡ Answered locally in {(time.perf_counter() - t_start) * 1000:.1f} ms"
+                       f"{' (cached)' if response['cached'] else ''}")
+        else:
+            # Open-ended: only now pay for a remote model call
+            res, ttft = stream_insight("AI Answer", f"Question: {question}\nData: {formatted_stats}. Answer briefly.")
+            st.caption(f"⚡ First words in {ttft:.2f}s · complete in {time.perf_counter() - t_start:.2f}s")
+        database.save_log(f"Asked: {question}", "Manager")
 
 with col_innov_2:
     st.info("✉️ **Auto-Emailer**")
@@ -203,8 +309,7 @@ with col_innov_2:
             f"Structure: Subject, Executive Summary, Key Metrics, Conclusion. \n"
             f"Tone: Professional."
         )
-        res = fast_ai_insight(email_prompt)
-        ui.text_card("Draft: Executive Brief", res)
+        res, _ = stream_insight("Draft: Executive Brief", email_prompt) # full draft assembled for the mailto link
         subject = urllib.parse.quote("Executive Update: Q3 Performance")
         safe_body = urllib.parse.quote(res)
         st.link_button("🚀 Open in Outlook/Gmail", f"mailto:?subject={subject}&body={safe_body}")
@@ -5,14 +5,19 @@ import plotly.express as px
 import sys
 import os
 import plotly.graph_objects as go
+import numpy as np
 
 
 # --- CONNECT TO BACKEND ---
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 from src.analyzer import DataAnalyzer
 from src.data_processor import DataProcessor
-from modules import database
-from utils import ui
+from src.running_stats import DatasetStats
+from src.quantile_sketch import KLLSketch
+from src.filter_index import FilterIndex
+from src.correlation import CorrelationAccumulator
+from modules import database, cleaning
+from utils import ui, math_utils
 
 @st.cache_data(show_spinner=False)
 def get_png_bytes(fig):
@@ -42,13 +47,20 @@ if "df" not in st.session_state or st.session_state.df is None:
 
 # --- CACHING ---
 @st.cache_data(show_spinner=False)
-def get_summary_cached(df):
-    analyzer = DataAnalyzer(df)
+def get_summary_cached(df, _sketches=None):
+    analyzer = DataAnalyzer(df, sketches=_sketches)
     return analyzer.get_summary()
 
-@st.cache_data(show_spinner=False)
-def compute_corr_matrix(df, numeric_cols):
-    return df[numeric_cols].corr()
+def compute_corr_matrix(df, numeric_cols, cache_key):
+    """Chunked XᵀX correlation, memoised per dataset version and filter (no hashing of the frame)"""
+    cache = st.session_state.setdefault("corr_cache", {})
+    if cache_key not in cache:
+        if len(cache) >= 8:
+            cache.pop(next(iter(cache)))
+        # float32 GEMMs halve memory traffic on wide telemetry exports; totals still accumulate in float64
+        dtype = np.float32 if len(numeric_cols) > 100 else np.float64
+        cache[cache_key] = CorrelationAccumulator.from_frame(df, numeric_cols, dtype=dtype).corr()
+    return cache[cache_key]
 
 @st.cache_data(show_spinner=False)
 def sample_df(df, max_rows=5000):
@@ -59,13 +71,23 @@ def sample_df(df, max_rows=5000):
 # --- SIDEBAR FILTERS ---
 df_original = st.session_state.df
 st.sidebar.header("🔍 Dataset Controls")
-categorical_cols = df_original.select_dtypes(include=['object']).columns.tolist()
+dataset_stats = st.session_state.get("dataset_stats")
+categorical_cols = df_original.select_dtypes(include=['object', 'category']).columns.tolist()
+if dataset_stats is not None:
+    categorical_cols = [col for col in dataset_stats.category_columns() if col in categorical_cols]
 
+active_filter = None
 if categorical_cols:
     filter_col = st.sidebar.selectbox("Filter Category", ["All Data"] + categorical_cols)
     if filter_col != "All Data":
-        val = st.sidebar.selectbox(f"Select {filter_col}", df_original[filter_col].unique())
-        df = df_original[df_original[filter_col] == val]
+        # Row index built once per dataset: option lists and filtered rows without a full scan per rerun
+        filter_index = st.session_state.get("filter_index")
+        if filter_index is None or filter_index.df is not df_original:
+            filter_index = st.session_state.filter_index = FilterIndex(df_original)
+
+        val = st.sidebar.selectbox(f"Select {filter_col}", filter_index.values(filter_col))
+        df = filter_index.filter(filter_col, val)
+        active_filter = (filter_col, val)
         st.sidebar.success(f"Filtered to {len(df)} rows")
         database.save_log(f"Filtered data by {filter_col} = {val}", "Analyst")
     else:
@@ -73,8 +95,21 @@ if categorical_cols:
 else:
     df = df_original
 
+# Quantile sketches built at ingestion cover every row (the whole file for streamed uploads)
+full_sketches = dataset_stats.sketches if dataset_stats is not None and df is df_original else {}
+
+def get_sketch(column):
+    """Full-data quantile sketch when unfiltered, otherwise one built over the filtered rows"""
+    if column in full_sketches:
+        return full_sketches[column]
+    return KLLSketch.from_values(df[column].to_numpy(dtype=np.float64, na_value=np.nan))
+
 # --- TOP METRICS ---
-summary = get_summary_cached(df)
+summary = get_summary_cached(df, full_sketches)
+ingest_stats = st.session_state.get("ingest_stats")
+if ingest_stats:
+    st.caption(f"🧪 Working sample of {len(df_original):,} rows from {ingest_stats['rows']:,} streamed records "
+               f"({sum(ingest_stats['missing'].values()):,} missing cells in the full file).")
 col1, col2, col3, col4 = st.columns(4)
 with col1:
     ui.card("Data Quality", f"{summary['data_quality'] * 100:.0f}%", "Health Score", "❤️")
@@ -95,17 +130,51 @@ with col_clean_action:
         processor = DataProcessor()
         processor.data = df
         cleaned_df = processor.clean_data()
+
+        # Keep the aggregates in step: subtract only the dropped rows rather than rescanning what is left
+        # (streamed uploads keep their full-file aggregates; only the sample was cleaned)
+        if not ingest_stats:
+            if dataset_stats is not None and df is df_original:
+                removed = DatasetStats.from_frame(df.iloc[processor.removed_positions])
+                st.session_state.dataset_stats = dataset_stats.subtract(removed).select(cleaned_df.columns)
+            else:
+                st.session_state.dataset_stats = DatasetStats.from_frame(cleaned_df)
+
+        # New frame, new version: derived structures keyed on it (correlation, rollup) are rebuilt on demand
+        st.session_state.dataset_version = st.session_state.get("dataset_version", 0) + 1
+        if ingest_stats:
+            st.session_state.rollup_version = st.session_state.dataset_version #the full-file cube still holds
         st.session_state.df = cleaned_df
         database.save_log("Ran Auto-Cleaning", "Analyst")
         st.success(f"✅ Cleaned! Removed duplicates & empty rows.")
         time.sleep(1)
         st.rerun()
 
+    # Streamed uploads: clean every row of the original file on disk, not just the sample
+    if ingest_stats and st.session_state.get("upload") is not None:
+        if st.button("🧮 Full-File Clean (Out-of-Core)"):
+            with st.spinner("Partitioning and deduplicating the full file..."):
+                cleaned_path, clean_report = cleaning.perform_out_of_core_cleaning(st.session_state.upload)
+            st.session_state.cleaned_path = cleaned_path
+            st.session_state.clean_report = clean_report
+            if cleaned_path is None:
+                st.error("Full-file clean failed; the cleaned file could not be written.")
+            else:
+                database.save_log("Ran Out-of-Core Cleaning", "Analyst")
+
 with col_clean_info:
     csv = df.to_csv(index=False).encode('utf-8')
     if st.download_button("💾 Download Cleaned CSV", csv, "cleaned_data.csv", "text/csv"):
         database.save_log("Downloaded cleaned CSV file", "Analyst")
 
+    clean_report = st.session_state.get("clean_report")
+    if clean_report and os.path.exists(st.session_state.get("cleaned_path") or ""):
+        st.info(f"🧮 Full file: removed **{clean_report['removed']:,}** duplicates and "
+                f"**{clean_report['empty rows']:,}** empty rows from {clean_report['rows']:,} records.")
+        with open(st.session_state.cleaned_path, "rb") as f:
+            if st.download_button("💾 Download Full Cleaned CSV", f, "cleaned_full_data.csv", "text/csv"):
+                database.save_log("Downloaded full cleaned CSV file", "Analyst")
+
 # --- DEEP DIVE ANALYTICS ---
 st.divider()
 st.markdown("### 🔍 Deep Dive Analytics")
@@ -127,8 +196,11 @@ with tab1:
     with col_chart:
 
         if target_col and st.button(f"📊 Show {target_col} Distribution"):
-            df_sampled = sample_df(df)
-            fig = px.histogram(df_sampled, x=target_col, nbins=20, color_discrete_sequence=['#0ea5e9'], title=f"Distribution of {target_col}")
+            # Bin counts over all rows from the sketch instead of plotting a 5k-row sample
+            counts, edges = get_sketch(target_col).histogram(20)
+            fig = px.bar(x=(edges[:-1] + edges[1:]) / 2, y=counts, labels={"x": target_col, "y": "count"},
+                         color_discrete_sequence=['#0ea5e9'], title=f"Distribution of {target_col}")
+            fig.update_layout(bargap=0)
             st.plotly_chart(fig, use_container_width=True)
             
             col1, col2, col3 = st.columns(3)
@@ -139,7 +211,13 @@ with tab1:
 
     with col_stats:
         if target_col:
-            desc = df[target_col].describe()
+            if dataset_stats is not None and df is df_original and target_col in full_sketches:
+                column_stats = dataset_stats.column_summary(target_col)
+                desc = pd.Series({key: column_stats[key] for key in ("count", "mean", "std", "min")} |
+                                 {"25%": column_stats["q1"], "50%": column_stats["median"], "75%": column_stats["q3"],
+                                  "max": column_stats["max"]}, name=target_col)
+            else:
+                desc = df[target_col].describe()
             st.write("") 
             st.write("") 
             st.write("") 
@@ -216,15 +294,21 @@ with tab3:
         fig = px.box(df_sampled, y=y_axis, x=None if group_col == "None" else group_col, points="outliers",
                      title=f"Box Plot of {y_axis}" if group_col == "None" else f"Box Plot of {y_axis} by {group_col}")
         st.plotly_chart(fig, use_container_width=True)
-        q1 = df[y_axis].quantile(0.25)
-        q3 = df[y_axis].quantile(0.75)
-        iqr = q3 - q1
-        outlier_count = df[(df[y_axis] < q1 - 1.5*iqr) | (df[y_axis] > q3 + 1.5*iqr)].shape[0]
+        # Fences from the sketch; the count is exact whenever the rows themselves are in memory
+        outlier_count, low, high = get_sketch(y_axis).iqr_outliers()
+        if not (ingest_stats and y_axis in full_sketches):
+            outlier_count = int(((df[y_axis] < low) | (df[y_axis] > high)).sum())
         
         col1, col2, col3 = st.columns(3)
         with col1:  # middle column
             st.info(f"🚨 Outliers detected: **{outlier_count}**")
 
+        # Most extreme values by robust (median/MAD) score, scanned chunk by chunk
+        extremes = math_utils.scan_anomalies(df[[y_axis]], top_k=10, method="robust")
+        if extremes:
+            st.markdown("**Most extreme values**")
+            st.dataframe(pd.DataFrame(extremes), use_container_width=True, hide_index=True)
+
         col1, col2, col3 = st.columns(3)
         with col1:  # middle column
             plotly_png_download(fig, f"{x_axis}_vs_{y_axis}.png")
@@ -246,8 +330,10 @@ with tab4:
 # --- CORRELATION MATRIX ---
 st.divider()
 st.markdown("### 🔢 Correlation Heatmap")
-if len(numeric_cols) > 1:
-    corr_matrix = compute_corr_matrix(df, numeric_cols)
+corr_key = (st.session_state.get("dataset_version"), active_filter, tuple(numeric_cols))
+if len(numeric_cols) > 1 and (corr_key in st.session_state.get("corr_cache", {}) or st.button("🔢 Compute Correlation Heatmap")):
+    with st.spinner("Accumulating cross-products..."):
+        corr_matrix = compute_corr_matrix(df, numeric_cols, corr_key)
     fig_corr = px.imshow(corr_matrix, text_auto=True, color_continuous_scale='RdBu_r', title="Feature Correlation")
     st.plotly_chart(fig_corr, use_container_width=True)
 
@@ -255,5 +341,5 @@ if len(numeric_cols) > 1:
     with col3:  # middle column
         plotly_png_download(fig_corr, f"correlation_matrix.png")
         database.save_log(f"Downloaded Correlation Heatmap", "Analyst")
-else:
+elif len(numeric_cols) <= 1:
     st.warning("Not enough numeric columns for correlation.")
\ No newline at end of file
@@ -5,21 +5,31 @@ Purpose: Scalable data analysis, anomaly detection, and business insight generat
 
 import pandas as pd
 import numpy as np
-from typing import Dict, Any
+from typing import Dict, Any, Optional
+
+try:
+    from src.profiler import profile_frame
+    from src.query_engine import QueryEngine
+except ImportError: #running this file directly from inside src/
+    from profiler import profile_frame
+    from query_engine import QueryEngine
 
 class DataAnalyzer:
     """Analyze data and generate useful business insights"""
 
-    def __init__(self, data:pd.DataFrame):
-        """Initialize DataAnalyzer with data"""
+    def __init__(self, data:pd.DataFrame, sketches:Optional[Dict[str, Any]] = None):
+        """Initialize DataAnalyzer with data and optional per-column quantile sketches (DatasetStats.sketches)"""
 
-        self.df = data.copy() #Work on a copy to preserve original data
+        self.df = data #Read-only: the analyzer never mutates the frame, so sharing it avoids a full copy
+        self.sketches = sketches or {} #quartiles come from these instead of selecting over every value
         self._profiled = False #flag enables lazy evaluation by ensuring expensive dataset profiling operations are executed only once and cached for reuse
 
         self.numeric_cols = []
         self.categorical_cols = []
         self.missing_data_summary = {}
         self.numeric_data_summary = {}
+        self.profile = {} #raw output of the fused profiling kernel; every get_* accessor is served from it
+        self.query_engine = None #created on the first question; keeps its own result cache
 
     def _profile_data(self):
         """Internal method to profile the dataset"""
@@ -27,8 +37,10 @@ class DataAnalyzer:
         if self._profiled:
             return
 
-        self.numeric_cols = self.df.select_dtypes(include=[np.number]).columns.tolist() #Identify numeric columns
-        self.categorical_cols = self.df.select_dtypes(exclude=[np.number]).columns.tolist() #Identify categorical columns
+        self.profile = profile_frame(self.df, sketches=self.sketches) #one scan: missing counts, numeric stats and duplicate rows
+
+        self.numeric_cols = self.profile["numeric_cols"] #Identify numeric columns
+        self.categorical_cols = self.profile["categorical_cols"] #Identify categorical columns
         
         self.missing_data_summary = self._compute_missing_data_summary()
         self.numeric_data_summary = self._compute_numeric_data_summary()
@@ -47,7 +59,7 @@ class DataAnalyzer:
             "numeric_columns" : len(self.numeric_cols),
             "categorical_columns" : len(self.categorical_cols),
             "missing_values" : int(sum(v["count"] for v in self.missing_data_summary.values())),
-            "duplicate_rows" : int(self.df.duplicated().sum()),
+            "duplicate_rows" : self.profile["duplicate_rows"],
             "data_quality" : round(self._calculate_quality(), 2)
         }
     
@@ -65,20 +77,10 @@ class DataAnalyzer:
     def _compute_numeric_data_summary(self) -> Dict[str, Dict[str, Any]]:
         """Compute summary of numeric data for each column"""
 
-        if not self.numeric_cols:
-            return {}
-        
-        desc = self.df[self.numeric_cols].describe().T
         return{
             col: {
-                "count": int(desc.loc[col, "count"]),
-                "mean": float(desc.loc[col, "mean"]),
-                "median": float(self.df[col].median()),
-                "std": float(desc.loc[col, "std"]),
-                "min": float(desc.loc[col, "min"]),
-                "max": float(desc.loc[col, "max"]),
-                "q1": float(desc.loc[col, "25%"]),
-                "q3": float(desc.loc[col, "75%"])
+                key: self.profile["numeric"][col][key]
+                for key in ("count", "mean", "median", "std", "min", "max", "q1", "q3")
             } 
             
             for col in self.numeric_cols
@@ -93,10 +95,9 @@ class DataAnalyzer:
     def _compute_missing_data_summary(self) -> Dict[str, Dict[str, Any]]:
         """Compute summary of missing data for each column"""
 
-        missing_summary = self.df.isna().sum()
         missing = {}
 
-        for column, count in missing_summary.items():
+        for column, count in self.profile["missing"].items():
             if count > 0:
                 missing[column] = {
                     "count" : int(count),
@@ -111,25 +112,26 @@ class DataAnalyzer:
         self._profile_data()
         return self.missing_data_summary
     
-    def answer_question(self, question:str) -> str:
-        """Generate answers to specific statistical questions about the data"""
+    def answer_question(self, question:str) -> Optional[str]:
+        """
+        Answer a statistical question ("total Sales by Region", "top 5 products by Units_Sold", ...) locally.
+        Returns None for open-ended questions, which should go to the LLM instead.
+        """
 
-        self._profile_data()
         q = question.lower()
 
-        if "how many" in q or "records" in q:
-            return f"The dataset contains {len(self.df):,} records."
-
-        if "summary" in q:
+        if "summary" in q and "by" not in q.split():
             return str(self.get_summary())
 
         if "missing" in q:
-            return "No missing values found." if not self._missing_data_summary else str(self._missing_summary)
+            missing = self.get_missing_data_summary()
+            return "No missing values found." if not missing else str(missing)
 
-        if "average" in q or "mean" in q:
-            return str(self.get_numeric_summary())
+        if self.query_engine is None:
+            self.query_engine = QueryEngine(self.df)
 
-        return "I can answer questions about records, summaries, averages, and missing data."
+        response = self.query_engine.answer(question)
+        return None if response is None else response["answer"]
 
 if __name__ == "__main__":
 
@@ -3,65 +3,334 @@ Module: data_processor.py
 Purpose: Load and clean data from files
 """
 
+import io
+import os
+import re
+import tempfile
+import contextlib
 import pandas as pd
 import numpy as np
+from src.dedup import external_clean_csv
+from src.parallel_loader import parallel_read_csv, PARALLEL_MIN_BYTES
+from src.excel_reader import read_excel_streaming
+
+DATE_LIKE = re.compile(r"^\s*(\d{4}[-/.]\d{1,2}[-/.]\d{1,2}|\d{1,2}[-/.]\d{1,2}[-/.]\d{2,4})([ T]\d{1,2}:\d{2}(:\d{2}(\.\d+)?)?)?\s*$")
+
+@contextlib.contextmanager
+def spill_to_tempfile(source, suffix=".csv"):
+     """Yield a filesystem path for a source; buffers are spilled to a unique temp file that is removed afterwards"""
+
+     if isinstance(source, (str, os.PathLike)):
+          yield os.fspath(source)
+          return
+
+     #Unique per call, so concurrent sessions never share (or overwrite) a spill file
+     fd, temp_path = tempfile.mkstemp(prefix="orbit_", suffix=suffix)
+     try:
+          with os.fdopen(fd, "wb") as f:
+               if isinstance(source, (bytes, bytearray, memoryview)):
+                    f.write(source)
+               elif hasattr(source, "getbuffer"):
+                    f.write(source.getbuffer())
+               else:
+                    source.seek(0)
+                    for block in iter(lambda: source.read(8 * 1024**2), b""):
+                         f.write(block)
+          yield temp_path
+     finally:
+          os.remove(temp_path)
 
 class DataProcessor:
      """Load and process data files"""
 
-     def __init__(self):
-          """Initialize DataProcessor"""
+     def __init__(self, cache=None, workers=None):
+          """Initialize DataProcessor, optionally with a DatasetCache to skip re-parsing known files and a parser worker count"""
           self.data = None
-          self.original_file = None
+          self._removal_log = None #lets original_file be rebuilt without keeping a second full copy in RAM
+          self._dtype_log = {} #column -> (as-loaded dtype, as-loaded text of date columns) for columns optimize_dtypes converted
+          self.cache = cache
+          self.workers = workers or os.cpu_count() or 1
+          self.memory_report = None
+          self.clean_report = None
+          self.removed_positions = None #positions (in the pre-clean frame) of the rows the last clean_data dropped
+
+     @staticmethod
+     def _resolve_source(file_path, file_format=None):
+               """Return a readable source and its format for a path, upload, file object or raw buffer"""
+
+               if isinstance(file_path, (bytes, bytearray, memoryview)):
+                    #Raw buffers carry no file name, so default to CSV unless told otherwise
+                    return io.BytesIO(file_path), (file_format or "csv")
+
+               if isinstance(file_path, (str, os.PathLike)):
+                    name = os.fspath(file_path)
+               elif hasattr(file_path, "read"):
+                    name = getattr(file_path, "name", "") or ""
+                    file_path.seek(0)
+               else:
+                    raise ValueError("Unsupported input. Please pass a file path, an uploaded file or a bytes buffer.")
+
+               if file_format is None:
+                    if name.endswith(".csv"):
+                         file_format = "csv"
+                    elif name.endswith(("xlsx","xls")):
+                         file_format = name.rsplit(".", 1)[-1]
+                    elif not name and not isinstance(file_path, (str, os.PathLike)):
+                         file_format = "csv"
+
+               return file_path, file_format
+
+     def _read_csv_parallel(self, source):
+               """Parse a CSV across worker processes; buffers are spilled to a unique temp file the workers can open"""
+
+               with spill_to_tempfile(source) as path:
+                    return parallel_read_csv(path, workers=self.workers, min_bytes=0) #size was already checked by _use_parallel
+
+     def _use_parallel(self, source, parallel):
+               """Decide whether a CSV is large enough for the multi-core parser (parallel=None means automatic)"""
+
+               if parallel is not None:
+                    return parallel and self.workers > 1
+
+               if isinstance(source, (str, os.PathLike)):
+                    size = os.path.getsize(source)
+               else:
+                    size = getattr(source, "size", None) or (source.getbuffer().nbytes if hasattr(source, "getbuffer") else 0)
+
+               return self.workers > 1 and size >= PARALLEL_MIN_BYTES
+
+     def _read_excel(self, source, file_format, sheet_name):
+               """Read one sheet; .xlsx goes through the streaming read-only reader (and the cache), legacy .xls through pandas"""
 
-     def load_data(self, file_path):
-               """Load data from CSV or Excel file"""
+               if file_format == "xls":
+                    return pd.read_excel(source, sheet_name=sheet_name or 0)
+
+               if not self.cache:
+                    return read_excel_streaming(source, sheet_name)
+
+               key = self.cache.content_key(source)
+               variant = f"xlsx-{sheet_name or 'first'}"
+               df = self.cache.get(key, variant)
+               if df is None:
+                    df = read_excel_streaming(source, sheet_name)
+                    self.cache.put(key, df, variant)
+               return df
+
+     def load_data(self, file_path, optimize=False, file_format=None, parallel=None, sheet_name=None):
+               """Load data from a CSV or Excel path, Streamlit UploadedFile, BytesIO or memoryview, optionally shrinking dtypes (see optimize_dtypes)"""
 
                try:
-                    if file_path.endswith(".csv"):
-                         self.data = pd.read_csv(file_path)
+                    source, file_format = self._resolve_source(file_path, file_format)
+
+                    #Buffers are parsed in place; nothing is written to disk unless the parallel parser needs a path
+                    if file_format == "csv":
+                         reader = self._read_csv_parallel if self._use_parallel(source, parallel) else pd.read_csv
+                         self.data = self.cache.load_csv(source, reader=reader) if self.cache else reader(source)
                     
-                    elif file_path.endswith(("xlsx","xls")):
-                         self.data = pd.read_excel(file_path)
+                    elif file_format in ("xlsx","xls"):
+                         self.data = self._read_excel(source, file_format, sheet_name)
 
                     else:
                          raise ValueError("Unsupported file format. Please upload a CSV or Excel file.")
-                    
-                     # Keep original for comparison
-                    self.original_file = self.data.copy()
+
+                    # Original stays reachable via original_file (rebuilt on demand, no full copy)
+                    self._removal_log = None
+                    self._dtype_log = {}
 
                     print(f"rows : {self.data.shape[0]}\ncolumns: {self.data.shape[1]}")
+
+                    if optimize:
+                         self.optimize_dtypes()
+
                     return self.data
                
                except Exception as e:
                     print(f"Error loading data : {e}")
                     raise
             
+     def optimize_dtypes(self, category_ratio=0.5, date_sample=1000):
+               """Shrink dtypes: low-cardinality text to category, date-like text to datetime64, numbers to the smallest safe width"""
+
+               if self.data is None:
+                    raise ValueError("No data found. Please load the data first.")
+
+               before = self.data.memory_usage(deep=True).sum()
+               optimized = {}
+
+               for column in self.data.columns:
+                    series = self.data[column]
+
+                    if pd.api.types.is_integer_dtype(series) and not isinstance(series.dtype, pd.CategoricalDtype):
+                         #Unsigned when possible: 0..255 fits uint8 where int8 stops at 127
+                         downcast = "unsigned" if len(series) and series.min() >= 0 else "integer"
+                         optimized[column] = pd.to_numeric(series, downcast=downcast)
+
+                    elif pd.api.types.is_float_dtype(series):
+                         #Only drop to float32 when every value survives the round trip exactly
+                         smaller = series.astype(np.float32)
+                         if ((smaller.astype(np.float64) == series) | series.isna()).all():
+                              optimized[column] = smaller
+
+                    elif pd.api.types.is_object_dtype(series) or pd.api.types.is_string_dtype(series):
+                         non_null = series.dropna()
+                         if non_null.empty:
+                              continue
+
+                         #Date-like strings: check a sample first, then require every value to parse
+                         sample = non_null.iloc[:date_sample].astype(str)
+                         if sample.str.match(DATE_LIKE).all():
+                              parsed = pd.to_datetime(series, errors="coerce")
+                              if parsed.notna().sum() == len(non_null):
+                                   optimized[column] = parsed
+                                   continue
+
+                         if non_null.nunique() < len(series) * category_ratio:
+                              optimized[column] = series.astype("category")
+
+               for column, series in optimized.items():
+                    #Logged so original_file can undo it; dates keep their text since formatting does not round-trip
+                    if column not in self._dtype_log:
+                         text = None
+                         if pd.api.types.is_datetime64_any_dtype(series):
+                              text = pd.Categorical(self._as_loaded(self.data[column]))
+                         self._dtype_log[column] = (self.data[column].dtype, text)
+                    self.data[column] = series
+
+               after = self.data.memory_usage(deep=True).sum()
+               self.memory_report = {
+                    "before (MB)" : float(before/(1024**2)),
+                    "after (MB)" : float(after/(1024**2)),
+                    "reduction (%)" : round(float(1 - after/before) * 100, 2) if before else 0.0,
+                    "converted columns" : {column: str(series.dtype) for column, series in optimized.items()}
+               }
+
+               print(f"Memory optimized: {self.memory_report['before (MB)']:.2f} MB -> {self.memory_report['after (MB)']:.2f} MB")
+               return self.data
+
      def clean_data(self):
                """Clean the loaded data by handling empty rows and columns, duplicates and reset index"""
 
                if self.data is None:
                     raise ValueError("No data found. Please load the data first.")
                
+               before = self.data
+
                #Remove completey empty rows and columns
 
-               self.data = self.data.dropna(how="all", axis = 0) #rows
+               missing = before.isna()
+               empty_rows = missing.all(axis=1).to_numpy() #rows
+               empty_columns = missing.all(axis=0).to_numpy() #columns
+               del missing
 
-               self.data = self.data.dropna(how="all", axis = 1) #columns
+               remaining_rows = np.flatnonzero(~empty_rows)
+               remaining = before.iloc[remaining_rows, np.flatnonzero(~empty_columns)]
 
-               #Remove duplicates
+               #Remove duplicates (every row is mapped to the first occurrence of its values)
 
-               dup_before = len(self.data)
-               self.data = self.data.drop_duplicates()
-               dup_after = len(self.data)
+               if remaining.shape[1]:
+                    codes, first_rows = self._duplicate_groups(remaining)
+               else:
+                    codes = np.arange(len(remaining))
+                    first_rows = codes
 
-               removed = dup_before - dup_after
+               removed = len(remaining) - len(first_rows)
 
                #Reset index
-               self.data = self.data.reset_index(drop=True)
+               self.data = remaining.iloc[first_rows].reset_index(drop=True)
+
+               self._log_removals(before, remaining_rows, codes, first_rows, empty_columns)
+
+               kept = np.zeros(len(before), dtype=bool)
+               kept[remaining_rows[first_rows]] = True
+               self.removed_positions = np.flatnonzero(~kept)
 
                print(f"Data cleaned. Removed {removed} duplicate rows.")
                return self.data
+
+     @staticmethod
+     def _duplicate_groups(remaining):
+               """Duplicate group of every remaining row and the rows to keep (the rows drop_duplicates keeps)"""
+
+               #Same per-column factorisation DataFrame.duplicated uses, combined into one integer key per row
+               keys = np.zeros(len(remaining), dtype=np.int64)
+               size = 1
+               for j in range(remaining.shape[1]):
+                    labels, uniques = pd.factorize(remaining.iloc[:, j], use_na_sentinel=False) #NaN/None is a value, as in drop_duplicates
+                    if size * max(len(uniques), 1) >= 2**63:
+                         keys, distinct = pd.factorize(keys) #re-number the key space before it overflows int64
+                         size = len(distinct)
+                    keys = keys * len(uniques) + labels
+                    size *= max(len(uniques), 1)
+
+               codes = pd.factorize(keys)[0] #groups numbered by first appearance
+               if len(codes) == 0:
+                    return codes, codes
+
+               #A row opens a new group exactly when its code exceeds all before it
+               seen = np.maximum.accumulate(np.concatenate([[-1], codes[:-1]]))
+               return codes, np.flatnonzero(codes > seen)
+
+     def clean_file(self, file_path, output_path, max_partition_mb=256):
+               """Out-of-core clean_data for CSV files bigger than memory; writes the cleaned rows to output_path"""
+
+               self.clean_report = external_clean_csv(file_path, output_path, max_partition_mb=max_partition_mb)
+               return self.clean_report
+
+     def _log_removals(self, before, remaining_rows, codes, first_rows, empty_columns):
+               """Record how every row of `before` maps onto the cleaned data instead of keeping a full copy of it"""
+
+               #source[p] = row of the cleaned data holding original row p's values, -1 for a dropped empty row
+               cleaned_row_of_code = np.empty(codes.max() + 1 if len(codes) else 0, dtype=np.int64)
+               cleaned_row_of_code[codes[first_rows]] = np.arange(len(first_rows))
+
+               dtype = np.int32 if len(before) < np.iinfo(np.int32).max else np.int64
+               source = np.full(len(before), -1, dtype=dtype)
+               source[remaining_rows] = cleaned_row_of_code[codes]
+
+               if self._removal_log is None:
+                    self._removal_log = {
+                         "source" : source,
+                         "index" : before.index,
+                         "columns" : before.columns,
+                         "empty columns" : {column: before[column].dtype for column in before.columns[empty_columns]}
+                    }
+               else:
+                    #Cleaning already-cleaned data: compose with the earlier log so the as-loaded data stays reachable
+                    previous = self._removal_log["source"]
+                    self._removal_log["source"] = np.where(previous >= 0, source[np.maximum(previous, 0)], -1).astype(dtype)
+                    self._removal_log["empty columns"].update({column: before[column].dtype for column in before.columns[empty_columns]})
+
+     def _as_loaded(self, series):
+               """Values of a column of the current data, aligned with the rows as originally loaded"""
+
+               if self._removal_log is None:
+                    return series.to_numpy()
+               return pd.Series(series.to_numpy()).reindex(self._removal_log["source"]).to_numpy()
+
+     @property
+     def original_file(self):
+               """Data as originally loaded (rows, columns and dtypes), rebuilt on demand from the current data, the removal log and the dtype log"""
+
+               if self._removal_log is None and not self._dtype_log:
+                    return self.data.copy() #a snapshot, like every other path, so edits to self.data don't reach it
+
+               log = self._removal_log
+               if log is None:
+                    original = self.data.copy()
+               else:
+                    original = self.data.reindex(log["source"]) #-1 is not a label, so dropped empty rows come back as all-NaN
+
+                    for column, dtype in log["empty columns"].items():
+                         original[column] = pd.Series(np.nan, index=original.index).astype(dtype)
+
+                    original = original[log["columns"]]
+                    original.index = log["index"]
+
+               for column, (dtype, text) in self._dtype_log.items():
+                    if column in original.columns:
+                         values = original[column] if text is None else pd.Series(np.asarray(text), index=original.index)
+                         original[column] = values.astype(dtype)
+               return original
           
      def get_info(self):
                """Get information about the data"""
@@ -73,7 +342,7 @@ class DataProcessor:
                     "rows" : self.data.shape[0],
                     "columns" : self.data.shape[1],
                     "missing values" : self.data.isnull().sum().sum(),
-                    "duplicate rows" : self.data.duplicated().sum(),
+                    "duplicate rows" : int(self.data.duplicated().sum()),
                     "memory usage (MB)" : self.data.memory_usage(deep=True).sum()/(1024**2)
                }
 
@@ -0,0 +1,225 @@
+"""
+Module: dataset_cache.py
+Purpose: Content-addressed on-disk Parquet cache of parsed datasets with size-bounded LRU eviction
+"""
+
+import os
+import io
+import json
+import uuid
+import hashlib
+import numpy as np
+import pandas as pd
+from typing import Any, Callable, Optional
+
+# Bumped whenever a to_state() layout changes; entries written under another version are never read
+META_VERSION = 2
+
+def _encode(value):
+    """json.dump fallback for the scalar types that occur as column names and category values"""
+
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, pd.Timestamp):
+        return {"__timestamp__": value.isoformat()}
+    raise TypeError(f"{type(value).__name__} values cannot be cached")
+
+def _decode(obj:dict):
+    """json.load hook that reverses _encode"""
+
+    return pd.Timestamp(obj["__timestamp__"]) if set(obj) == {"__timestamp__"} else obj
+
+def _parquet_safe(df:pd.DataFrame) -> pd.DataFrame:
+    """Frame Parquet can store: object columns mixing types (e.g. 1 and "N/A") become text, missing values stay missing"""
+
+    mixed = [i for i, dtype in enumerate(df.dtypes)
+             if dtype == object and pd.api.types.infer_dtype(df.iloc[:, i], skipna=True) in ("mixed", "mixed-integer")]
+    if not mixed:
+        return df
+
+    df = df.copy(deep=False)
+    for i in mixed:
+        column = df.iloc[:, i]
+        df.isetitem(i, column.where(column.isna(), column.astype(str)))
+    return df
+
+class DatasetCache:
+    """Cache parsed DataFrames on local disk, keyed by a hash of the raw upload bytes"""
+
+    def __init__(self, cache_dir:Optional[str] = None, max_bytes:int = 2 * 1024**3):
+        """Initialize DatasetCache with its directory and total size limit"""
+
+        self.cache_dir = cache_dir or os.getenv("ORBIT_CACHE_DIR", ".orbit_cache")
+        self.max_bytes = max_bytes
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    @staticmethod
+    def content_key(source, block_size:int = 8 * 1024**2) -> str:
+        """Hash the raw bytes of a path, upload or buffer without parsing it"""
+
+        digest = hashlib.blake2b(digest_size=16)
+
+        if isinstance(source, (str, os.PathLike)):
+            with open(source, "rb") as f:
+                for block in iter(lambda: f.read(block_size), b""):
+                    digest.update(block)
+        elif hasattr(source, "getbuffer"):
+            digest.update(source.getbuffer()) #Streamlit UploadedFile and BytesIO expose their bytes without a copy
+        elif isinstance(source, (bytes, bytearray, memoryview)):
+            digest.update(source)
+        else:
+            position = source.tell()
+            for block in iter(lambda: source.read(block_size), b""):
+                digest.update(block)
+            source.seek(position)
+
+        return digest.hexdigest()
+
+    def _path(self, key:str, variant:str, suffix:str) -> str:
+        """Get the cache file path of a key/variant pair"""
+
+        name = f"{key}-{variant}" if variant else key
+        return os.path.join(self.cache_dir, f"{name}{suffix}")
+
+    def _read(self, path:str, reader:Callable[[str], Any]) -> Optional[Any]:
+        """Read a cache entry and mark it as recently used"""
+
+        try:
+            value = reader(path)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"Ignoring unreadable cache entry {path}: {e}")
+            return None
+
+        try:
+            os.utime(path) #mtime doubles as the LRU access time
+        except OSError:
+            pass
+        return value
+
+    def _write(self, path:str, writer:Callable[[str], None]):
+        """Write a cache entry atomically so concurrent sessions never see a partial file"""
+
+        temp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        try:
+            writer(temp_path)
+            os.replace(temp_path, path)
+        except Exception as e:
+            print(f"Skipping dataset cache write: {e}")
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+        self._evict(keep=path)
+
+    def get(self, key:str, variant:str = "") -> Optional[pd.DataFrame]:
+        """Get a cached DataFrame, or None on a miss"""
+
+        return self._read(self._path(key, variant, ".parquet"), pd.read_parquet)
+
+    def put(self, key:str, df:pd.DataFrame, variant:str = ""):
+        """Store a DataFrame in columnar Parquet form (mixed-type object columns are stored as text)"""
+
+        safe = _parquet_safe(df)
+        self._write(self._path(key, variant, ".parquet"), lambda path: safe.to_parquet(path, index=False))
+
+    def get_meta(self, key:str, variant:str, cls:type) -> Optional[Any]:
+        """
+        Get a cached metadata object (DatasetStats, RollupCube, ...) rebuilt with cls.from_state, or None on a miss.
+        Entries are plain JSON, never unpickled, and ones written for another class or META_VERSION are misses.
+        """
+
+        def reader(path):
+            with open(path, "r", encoding="utf-8") as f:
+                payload = json.load(f, object_hook=_decode)
+            if payload.get("version") != META_VERSION or payload.get("type") != cls.__name__:
+                raise ValueError(f"written as {payload.get('type')} v{payload.get('version')}")
+            return cls.from_state(payload["state"])
+
+        return self._read(self._path(key, variant, f".v{META_VERSION}.json"), reader)
+
+    def put_meta(self, key:str, value:Any, variant:str):
+        """Store a metadata object's to_state() as versioned JSON alongside the cached frames"""
+
+        def writer(path):
+            payload = {"version": META_VERSION, "type": type(value).__name__, "state": value.to_state()}
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(payload, f, default=_encode)
+
+        self._write(self._path(key, variant, f".v{META_VERSION}.json"), writer)
+
+    def put_file(self, key:str, writer:Callable[[str], None], variant:str, suffix:str) -> Optional[str]:
+        """
+        Write a derived file (e.g. a cleaned CSV) into the cache with writer(path) and return its path.
+        It is evicted with the other entries, so it needs no cleanup; None if it could not be written.
+        """
+
+        path = self._path(key, variant, suffix)
+        self._write(path, writer)
+        return path if os.path.exists(path) else None
+
+    def load_csv(self, source, reader:Optional[Callable[..., pd.DataFrame]] = None, **read_kwargs) -> pd.DataFrame:
+        """Parse a CSV through the cache: hash, then read Parquet on a hit or parse (with `reader`, default pd.read_csv) and store on a miss"""
+
+        key = self.content_key(source)
+        variant = hashlib.blake2b(repr(sorted(read_kwargs.items())).encode(), digest_size=4).hexdigest() if read_kwargs else ""
+
+        df = self.get(key, variant)
+        if df is not None:
+            return df
+
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            source = io.BytesIO(source)
+        elif hasattr(source, "seek"):
+            source.seek(0)
+
+        df = (reader or pd.read_csv)(source, **read_kwargs)
+        self.put(key, df, variant)
+        return df
+
+    def _evict(self, keep:Optional[str] = None):
+        """Delete least recently used entries until the cache fits in max_bytes (never `keep`, the entry just written)"""
+
+        entries = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.is_file() and not entry.name.endswith(".tmp"):
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if path == keep: #an entry bigger than the whole budget still has to be returned to its caller
+                continue
+            try:
+                os.remove(path)
+            except OSError:
+                continue #another session already evicted it
+            total -= size
+
+    def clear(self):
+        """Remove every cache entry"""
+
+        for entry in os.scandir(self.cache_dir):
+            if entry.is_file():
+                os.remove(entry.path)
+
+if __name__ == "__main__":
+
+    import time
+
+    csv = io.BytesIO(b"Region,Sales\nNorth,100\nSouth,150\nEast,200\n")
+    cache = DatasetCache(cache_dir=".orbit_cache_demo")
+
+    for attempt in ("cold", "warm"):
+        start = time.perf_counter()
+        df = cache.load_csv(csv)
+        print(f"{attempt}: {len(df)} rows in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    cache.clear()
+    os.rmdir(cache.cache_dir)
@@ -0,0 +1,137 @@
+"""
+Module: dedup.py
+Purpose: Out-of-core cleaning (empty rows/columns, duplicates) for CSV files larger than memory
+"""
+
+import os
+import math
+import tempfile
+import pandas as pd
+import numpy as np
+from typing import Dict, Any, Optional
+
+MAX_PARTITION_BITS = 8 #2**8 spill files open at once, well under the usual 1024 open-file limit (ulimit -n)
+
+def _partition_bits(total_bytes:Optional[int], max_partition_mb:int) -> int:
+    """Pick the number of hash-prefix bits so that each partition stays under max_partition_mb"""
+
+    if not total_bytes:
+        return 6
+
+    partitions = max(1, math.ceil(total_bytes / (max_partition_mb * 1024**2)))
+    return min(MAX_PARTITION_BITS, max(1, math.ceil(math.log2(partitions)) + 1)) #one extra bit of headroom for uneven partitions
+
+def _source_size(source) -> Optional[int]:
+    """Size in bytes of a path, upload or buffer, if known"""
+
+    if isinstance(source, (str, os.PathLike)):
+        return os.path.getsize(source)
+    if hasattr(source, "size"):
+        return source.size
+    if hasattr(source, "getbuffer"):
+        return source.getbuffer().nbytes
+    return None
+
+def external_clean_csv(source, output_path:str, chunksize:int = 200_000, max_partition_mb:int = 256, work_dir:Optional[str] = None) -> Dict[str, Any]:
+    """
+    Same steps as DataProcessor.clean_data, computed in bounded memory. Values are compared
+    as the text written in the file, so "5" and "5.0" count as different rows here.
+
+    Rows are read as text, hashed to 64 bits and spilled to on-disk partitions by hash prefix,
+    so identical rows always land in the same partition. Duplicates within a chunk are dropped
+    before spilling, which shrinks the partitions for repetitive files; each partition is then
+    deduplicated on its exact values independently. Peak memory is one chunk or one partition, never the file.
+    Output rows are grouped by partition rather than kept in file order.
+    """
+
+    bits = _partition_bits(_source_size(source), max_partition_mb)
+    if hasattr(source, "seek"):
+        source.seek(0)
+
+    with tempfile.TemporaryDirectory(prefix="orbit_dedup_", dir=work_dir) as spill_dir:
+        paths = [os.path.join(spill_dir, f"part_{p:05d}.csv") for p in range(2**bits)]
+        handles = {}
+
+        columns = None
+        non_null = None
+        total_rows = 0
+        empty_rows = 0
+        removed = 0
+
+        # 1. Spill pass: drop empty rows, count non-nulls per column, route rows by hash prefix
+        try:
+            for chunk in pd.read_csv(source, chunksize=chunksize, dtype=str):
+                if columns is None:
+                    columns = chunk.columns
+                    non_null = np.zeros(len(columns), dtype=np.int64)
+
+                total_rows += len(chunk)
+                filled = chunk.notna()
+                non_null += filled.sum().to_numpy()
+
+                keep = filled.any(axis=1).to_numpy()
+                empty_rows += int((~keep).sum())
+                chunk = chunk[keep]
+                if chunk.empty:
+                    continue
+
+                # Keeping the first copy per chunk and then per partition keeps exactly drop_duplicates()' rows
+                unique = chunk.drop_duplicates()
+                removed += len(chunk) - len(unique)
+                chunk = unique
+
+                hashes = pd.util.hash_pandas_object(chunk, index=False).to_numpy()
+                partition = (hashes >> np.uint64(64 - bits)).astype(np.int64)
+
+                for p, rows in pd.Series(np.arange(len(chunk))).groupby(partition).indices.items():
+                    if p not in handles:
+                        handles[p] = open(paths[p], "w", newline="", encoding="utf-8")
+                    chunk.iloc[rows].to_csv(handles[p], header=False, index=False)
+        finally:
+            for handle in handles.values():
+                handle.close()
+
+        if columns is None:
+            raise ValueError("No data found in the file.")
+
+        # 2. Columns that were empty in every row are dropped, exactly like dropna(how="all", axis=1)
+        empty_columns = columns[non_null == 0].tolist()
+        kept_columns = columns[non_null > 0]
+
+        # 3. Dedup pass: one partition in memory at a time
+        output_rows = 0
+        pd.DataFrame(columns=kept_columns).to_csv(output_path, index=False)
+
+        for p in sorted(handles):
+            part = pd.read_csv(paths[p], header=None, names=columns, dtype=str, keep_default_na=False, na_values=[""])
+            part = part[kept_columns]
+
+            unique = part.drop_duplicates()
+            removed += len(part) - len(unique)
+            output_rows += len(unique)
+
+            unique.to_csv(output_path, mode="a", header=False, index=False)
+            os.remove(paths[p])
+
+    print(f"Data cleaned out-of-core. Removed {removed} duplicate rows.")
+    return {
+        "rows" : total_rows,
+        "output rows" : output_rows,
+        "empty rows" : empty_rows,
+        "empty columns" : empty_columns,
+        "removed" : removed,
+        "partitions" : 2**bits
+    }
+
+if __name__ == "__main__":
+
+    import io
+
+    csv = io.BytesIO(b"Region,Sales,Notes\nNorth,100,\nSouth,150,\nNorth,100,\n,,\nEast,200,\nSouth,150,\n")
+
+    with tempfile.TemporaryDirectory() as out_dir:
+        output_path = os.path.join(out_dir, "cleaned.csv")
+        report = external_clean_csv(csv, output_path, chunksize=2)
+
+        print(f"Report:\n{report}\n")
+        print(f"Cleaned Data:\n{pd.read_csv(output_path)}")
@@ -0,0 +1,143 @@
+"""
+Module: excel_reader.py
+Purpose: Stream .xlsx workbooks in bounded memory using openpyxl's read-only mode
+"""
+
+import pandas as pd
+from openpyxl import load_workbook
+from typing import Callable, Iterator, List, Optional
+
+def _rewind(source):
+    """Uploads and buffers may have been read already"""
+
+    if hasattr(source, "seek"):
+        source.seek(0)
+
+def _column_names(header_row) -> List[str]:
+    """Name columns the way pandas.read_excel does: blanks become 'Unnamed: i', repeats get '.1', '.2'"""
+
+    names = []
+    seen = {}
+    for i, value in enumerate(header_row):
+        name = f"Unnamed: {i}" if value is None else str(value)
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        else:
+            seen[name] = 0
+        names.append(name)
+    return names
+
+def list_sheets(source) -> List[str]:
+    """Get the sheet names of a workbook without loading any cells"""
+
+    _rewind(source)
+    workbook = load_workbook(source, read_only=True)
+    try:
+        return workbook.sheetnames
+    finally:
+        workbook.close()
+
+def iter_excel_chunks(source, sheet_name:Optional[str] = None, chunksize:int = 50_000, progress_callback:Optional[Callable[[float], None]] = None) -> Iterator[pd.DataFrame]:
+    """
+    Yield a sheet as DataFrames of up to `chunksize` rows.
+
+    Cells are read row by row in read-only mode (no full object model), collected into one
+    buffer per column and turned into a typed DataFrame once per batch. Fully blank rows are skipped.
+    Like read_excel, trailing blank header cells are dropped and a row with values beyond the header
+    adds 'Unnamed: i' columns (empty in earlier rows; earlier batches simply lack them).
+    """
+
+    _rewind(source)
+    workbook = load_workbook(source, read_only=True, data_only=True) #data_only: cached formula results, not formulas
+    try:
+        sheet = workbook[sheet_name] if sheet_name else workbook.worksheets[0]
+        total_rows = sheet.max_row #from the sheet's dimension record, may be missing
+        rows = sheet.iter_rows(values_only=True)
+
+        header = next(rows, None)
+        if header is None:
+            return
+
+        header = list(header)
+        while header and header[-1] is None:
+            header.pop()
+
+        names = _column_names(header)
+        width = len(names)
+        buffers = [[] for _ in range(width)]
+        buffered = 0
+        read = 1
+
+        for row in rows:
+            read += 1
+            if all(value is None for value in row):
+                continue
+
+            if len(row) > width and any(value is not None for value in row[width:]):
+                last = max(i for i, value in enumerate(row) if value is not None)
+                names += [f"Unnamed: {i}" for i in range(width, last + 1)]
+                buffers += [[None] * buffered for _ in range(width, last + 1)]
+                width = last + 1
+
+            for i in range(width):
+                buffers[i].append(row[i] if i < len(row) else None)
+            buffered += 1
+
+            if buffered >= chunksize:
+                yield pd.DataFrame(dict(zip(names, buffers)))
+                buffers = [[] for _ in range(width)]
+                buffered = 0
+
+                if progress_callback is not None and total_rows:
+                    progress_callback(min(read / total_rows, 1.0))
+
+        if buffered:
+            yield pd.DataFrame(dict(zip(names, buffers)))
+    finally:
+        workbook.close()
+
+def excel_header(source, sheet_name:Optional[str] = None) -> List[str]:
+    """Get the column names of a sheet by reading only its first row"""
+
+    _rewind(source)
+    workbook = load_workbook(source, read_only=True)
+    try:
+        sheet = workbook[sheet_name] if sheet_name else workbook.worksheets[0]
+        header = list(next(sheet.iter_rows(values_only=True, max_row=1), None) or [])
+        while header and header[-1] is None:
+            header.pop()
+        return _column_names(header)
+    finally:
+        workbook.close()
+
+def read_excel_streaming(source, sheet_name:Optional[str] = None, chunksize:int = 50_000) -> pd.DataFrame:
+    """Read a whole sheet through the streaming reader"""
+
+    chunks = list(iter_excel_chunks(source, sheet_name, chunksize))
+    if not chunks:
+        return pd.DataFrame(columns=excel_header(source, sheet_name))
+    #A column that was all blank in some batch (or absent from it) comes out as object: re-infer once over all rows
+    return pd.concat(chunks, ignore_index=True).infer_objects()
+
+if __name__ == "__main__":
+
+    import io
+    import time
+    import numpy as np
+
+    n = 20_000
+    df = pd.DataFrame({
+        "Region": np.random.choice(["North", "South", "East", "West"], n),
+        "Sales": np.random.randint(100, 5000, n),
+        "Profit": np.random.uniform(10.0, 500.0, n).round(2)
+    })
+
+    workbook_bytes = io.BytesIO()
+    df.to_excel(workbook_bytes, index=False, sheet_name="Finance")
+
+    print(f"Sheets: {list_sheets(workbook_bytes)}")
+
+    start = time.perf_counter()
+    streamed = read_excel_streaming(workbook_bytes, "Finance", chunksize=5_000)
+    print(f"streamed {len(streamed):,} rows in {time.perf_counter() - start:.2f}s, identical: {streamed.equals(df)}")
@@ -0,0 +1,87 @@
+"""
+Module: filter_index.py
+Purpose: Per-category row index so sidebar filters take O(matching rows) instead of scanning the frame
+"""
+
+import pandas as pd
+import numpy as np
+from typing import Dict, List
+
+class CategoryIndex:
+    """Rows of one column grouped by value: factorised codes, a stable sort permutation and per-value offsets"""
+
+    def __init__(self, column:pd.Series):
+        """Build the index in one factorise + one counting pass"""
+
+        codes, uniques = pd.factorize(column) #missing values get code -1 and are not indexed
+        self.values = list(uniques) #order of first appearance, same as Series.unique()
+        self._lookup = {value: code for code, value in enumerate(self.values)}
+
+        # Stable sort keeps each value's rows in their original order
+        self._order = np.argsort(codes, kind="stable")
+        counts = np.bincount(codes[codes >= 0], minlength=len(self.values))
+        missing = len(codes) - int(counts.sum())
+        self._offsets = missing + np.concatenate([[0], np.cumsum(counts)]) #rows with code -1 sort first
+
+    def positions(self, value) -> np.ndarray:
+        """Row positions holding `value` (empty if it never occurs)"""
+
+        code = self._lookup.get(value)
+        if code is None:
+            return np.empty(0, dtype=np.intp)
+        return self._order[self._offsets[code]:self._offsets[code + 1]]
+
+    def count(self, value) -> int:
+        """Number of rows holding `value`"""
+
+        code = self._lookup.get(value)
+        return 0 if code is None else int(self._offsets[code + 1] - self._offsets[code])
+
+class FilterIndex:
+    """CategoryIndex per column of one DataFrame, each built the first time the column is filtered on"""
+
+    def __init__(self, df:pd.DataFrame):
+        """Initialize FilterIndex for a frame (the frame must not be mutated while indexed)"""
+
+        self.df = df
+        self._columns: Dict[str, CategoryIndex] = {}
+
+    def column(self, name:str) -> CategoryIndex:
+        """Get (building once) the index of a column"""
+
+        if name not in self._columns:
+            self._columns[name] = CategoryIndex(self.df[name])
+        return self._columns[name]
+
+    def values(self, name:str) -> List:
+        """Distinct non-missing values of a column, in order of first appearance"""
+
+        return self.column(name).values
+
+    def filter(self, name:str, value) -> pd.DataFrame:
+        """Rows where column == value, in original order"""
+
+        return self.df.take(self.column(name).positions(value))
+
+if __name__ == "__main__":
+
+    import time
+
+    n = 2_000_000
+    df = pd.DataFrame({
+        "Region": np.random.choice(["North", "South", "East", "West"], n),
+        "Sales": np.random.randint(100, 5000, n)
+    })
+
+    index = FilterIndex(df)
+    index.column("Region")
+
+    start = time.perf_counter()
+    indexed = index.filter("Region", "North")
+    print(f"indexed filter: {(time.perf_counter() - start) * 1e3:.1f} ms")
+
+    start = time.perf_counter()
+    scanned = df[df["Region"] == "North"]
+    print(f"boolean scan:   {(time.perf_counter() - start) * 1e3:.1f} ms")
+
+    print(f"identical: {indexed.equals(scanned)}")
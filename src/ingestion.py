@@ -0,0 +1,108 @@
+"""
+Module: ingestion.py
+Purpose: Stream large uploads (CSV or Excel) in bounded-memory chunks and compute exact full-file aggregates
+"""
+
+import os
+import pandas as pd
+from typing import Dict, Any, Callable, Optional, Tuple
+from src.sampling import ReservoirSampler, StratifiedReservoirSampler
+from src.excel_reader import iter_excel_chunks
+from src.running_stats import DatasetStats
+from src.rollup import RollupCube
+
+class StreamingIngestor:
+    """Read a CSV chunk by chunk, aggregating the whole file while keeping only a working sample"""
+
+    def __init__(self, chunksize:int = 100_000, sample_rows:int = 10_000, max_categories:int = 1_000, stratify_by:Optional[str] = None, random_state:Optional[int] = 42):
+        """Initialize StreamingIngestor with chunk size, sample size, category tracking limit and optional stratify column"""
+
+        self.chunksize = chunksize
+        self.sample_rows = sample_rows
+        self.max_categories = max_categories #columns with more distinct values than this are treated as IDs and no longer counted
+
+        self.stats = DatasetStats(max_categories) #mergeable, so chunk partials combine exactly
+        self.rollup = RollupCube(max_categories) #per-category totals over the whole file, for filtered dashboards
+
+        # Uniform over the whole file rather than biased toward its head
+        if stratify_by:
+            self.sampler = StratifiedReservoirSampler(stratify_by, size=sample_rows, random_state=random_state)
+        else:
+            self.sampler = ReservoirSampler(size=sample_rows, random_state=random_state)
+
+    def ingest(self, source, progress_callback:Optional[Callable[[float], None]] = None, file_format:str = "csv", sheet_name:Optional[str] = None) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+        """Stream the whole source (CSV, or one sheet of an .xlsx workbook) and return (working sample, full-file stats)"""
+
+        if file_format == "xlsx":
+            for chunk in iter_excel_chunks(source, sheet_name, chunksize=self.chunksize, progress_callback=progress_callback):
+                self._consume(chunk)
+        else:
+            self._ingest_csv(source, progress_callback)
+
+        if progress_callback is not None:
+            progress_callback(1.0)
+
+        return self.get_sample(), self.get_stats()
+
+    def _ingest_csv(self, source, progress_callback:Optional[Callable[[float], None]]):
+        """Stream a CSV chunk by chunk, reporting progress by bytes read"""
+
+        handle, total_bytes, owns_handle = self._open(source)
+
+        try:
+            for chunk in pd.read_csv(handle, chunksize=self.chunksize):
+                self._consume(chunk)
+
+                if progress_callback is not None and total_bytes:
+                    progress_callback(min(handle.tell() / total_bytes, 1.0))
+        finally:
+            if owns_handle:
+                handle.close()
+
+    def _consume(self, chunk:pd.DataFrame):
+        """Feed one chunk to the aggregates and the sampler"""
+
+        self.stats.update(chunk)
+        self.rollup.update(chunk)
+        self.sampler.update(chunk)
+
+    def _open(self, source):
+        """Return a binary handle, its total size in bytes and whether we opened it ourselves"""
+
+        if isinstance(source, (str, os.PathLike)):
+            return open(source, "rb"), os.path.getsize(source), True
+
+        size = getattr(source, "size", None)
+        if size is None and hasattr(source, "getbuffer"):
+            size = source.getbuffer().nbytes
+
+        source.seek(0)
+        return source, size, False
+
+    def get_sample(self) -> pd.DataFrame:
+        """Get the working sample collected during ingestion"""
+
+        sample = self.sampler.get_sample()
+        if sample is None:
+            return pd.DataFrame(columns=self.stats.columns)
+
+        return sample
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get exact aggregates over every row of the file"""
+
+        stats = self.stats.to_dict()
+        stats["sample_rows"] = min(self.stats.rows, self.sample_rows)
+        return stats
+
+if __name__ == "__main__":
+
+    import io
+
+    csv = io.BytesIO(b"Region,Sales\nNorth,100\nSouth,150\nNorth,\nEast,200\n")
+
+    ingestor = StreamingIngestor(chunksize=2, sample_rows=3)
+    sample, stats = ingestor.ingest(csv, progress_callback=lambda p: print(f"progress: {p:.0%}"))
+
+    print(f"Sample:\n{sample}\n")
+    print(f"Stats:\n{stats}")
@@ -0,0 +1,144 @@
+"""
+Module: parallel_loader.py
+Purpose: Multi-core CSV parsing by splitting a file at newline-aligned byte ranges
+"""
+
+import io
+import os
+import multiprocessing
+import pandas as pd
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+PARALLEL_MIN_BYTES = 64 * 1024**2 #below this, process start-up costs more than it saves
+
+def _parse_range(file_path:str, start:int, end:int, names:List[str], dtype:Dict[str, str]) -> pd.DataFrame:
+    """Parse the rows in bytes [start, end) of a CSV file (runs in a worker process)"""
+
+    with open(file_path, "rb") as f:
+        f.seek(start)
+        buffer = f.read(end - start)
+
+    return pd.read_csv(io.BytesIO(buffer), header=None, names=names, dtype=dtype)
+
+def split_ranges(file_path:str, data_start:int, parts:int) -> List[Tuple[int, int]]:
+    """Split the data section of a file into byte ranges that each start at the beginning of a line"""
+
+    size = os.path.getsize(file_path)
+    step = max(1, (size - data_start) // parts)
+    bounds = [data_start]
+
+    with open(file_path, "rb") as f:
+        for guess in range(data_start + step, size, step):
+            if guess <= bounds[-1]:
+                continue
+            f.seek(guess - 1)
+            f.readline() #finish the line containing guess - 1, so a guess that is already a line start is kept
+            position = f.tell()
+            if position < size and position > bounds[-1]:
+                bounds.append(position)
+
+    bounds.append(size)
+    return [(start, end) for start, end in zip(bounds[:-1], bounds[1:]) if end > start]
+
+def _infer_layout(file_path:str, sample_rows:int) -> Tuple[int, List[str], Dict[str, object]]:
+    """Read the header once and derive a dtype map every worker shares"""
+
+    with open(file_path, "rb") as f:
+        f.readline()
+        data_start = f.tell()
+
+    sample = pd.read_csv(file_path, nrows=sample_rows)
+
+    # Float columns are pinned so that a range holding only whole numbers does not come back as int, and
+    # text columns so that a range where they happen to look numeric (or empty) still yields strings.
+    # Integer columns are left to per-range inference: a range with gaps becomes float, as a serial read would.
+    dtype = {}
+    for column in sample.columns:
+        if pd.api.types.is_float_dtype(sample[column]):
+            dtype[column] = "float64"
+        elif not pd.api.types.is_numeric_dtype(sample[column]) and not pd.api.types.is_bool_dtype(sample[column]):
+            dtype[column] = str
+    return data_start, sample.columns.tolist(), dtype
+
+def _has_quotes(file_path:str, block_size:int = 8 * 1024**2) -> bool:
+    """Quoted fields may contain newlines anywhere in the file, which would break newline-aligned splitting"""
+
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            if b'"' in block:
+                return True
+    return False
+
+def _mixed_columns(frames:List[pd.DataFrame]) -> List[str]:
+    """Columns parsed as numbers in some ranges and as text in others (a serial read makes them all text)"""
+
+    mixed = []
+    for column in frames[0].columns:
+        kinds = {pd.api.types.is_numeric_dtype(frame[column]) for frame in frames if frame[column].notna().any()}
+        if len(kinds) > 1:
+            mixed.append(column)
+    return mixed
+
+def parallel_read_csv(file_path:str, workers:Optional[int] = None, min_bytes:int = PARALLEL_MIN_BYTES, sample_rows:int = 10_000) -> pd.DataFrame:
+    """Parse a CSV file across a process pool, falling back to pandas' serial reader for small or quoted files"""
+
+    workers = workers or os.cpu_count() or 1
+
+    if workers < 2 or os.path.getsize(file_path) < min_bytes or _has_quotes(file_path):
+        return pd.read_csv(file_path)
+
+    data_start, names, dtype = _infer_layout(file_path, sample_rows)
+    ranges = split_ranges(file_path, data_start, workers * 4) #more ranges than workers evens out the load
+
+    if len(ranges) < 2:
+        return pd.read_csv(file_path)
+
+    starts, ends = zip(*ranges)
+    count = len(ranges)
+
+    try:
+        # spawn: forking a multi-threaded Streamlit server is unsafe
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+            frames = list(pool.map(_parse_range, [file_path] * count, starts, ends, [names] * count, [dtype] * count))
+
+            # A column that turned out to hold text beyond the sample is re-parsed as text in every range
+            mixed = _mixed_columns(frames)
+            if mixed:
+                dtype = {**dtype, **{column: str for column in mixed}}
+                frames = list(pool.map(_parse_range, [file_path] * count, starts, ends, [names] * count, [dtype] * count))
+    except Exception as e: #e.g. text in a column pinned to float from the sample
+        print(f"Parallel parse failed ({e}); falling back to serial read.")
+        return pd.read_csv(file_path)
+
+    return pd.concat(frames, ignore_index=True) #map() preserves range order, so rows keep file order
+
+if __name__ == "__main__":
+
+    import time
+    import tempfile
+
+    n = 2_000_000
+    df = pd.DataFrame({
+        "Date": np.random.choice(pd.date_range("2024-01-01", periods=365).astype(str), n),
+        "Region": np.random.choice(["North", "South", "East", "West"], n),
+        "Product": np.random.choice(["Laptop", "Mouse", "Keyboard", "Monitor", "Headphones"], n),
+        "Sales": np.random.randint(100, 5000, n),
+        "Units_Sold": np.random.randint(1, 100, n),
+        "Profit": np.random.uniform(10.0, 500.0, n).round(2)
+    })
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = os.path.join(temp_dir, "bench.csv")
+        df.to_csv(path, index=False)
+
+        start = time.perf_counter()
+        serial = pd.read_csv(path)
+        print(f"serial:   {time.perf_counter() - start:.2f}s")
+
+        start = time.perf_counter()
+        parallel = parallel_read_csv(path, min_bytes=0)
+        print(f"parallel: {time.perf_counter() - start:.2f}s ({os.cpu_count()} cores)")
+
+        print(f"identical: {serial.equals(parallel)}")
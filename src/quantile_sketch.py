@@ -0,0 +1,211 @@
+"""
+Module: quantile_sketch.py
+Purpose: Mergeable KLL quantile sketch for quartiles, IQR outliers and histograms without sorting full columns
+"""
+
+import numpy as np
+from typing import Iterable, List, Optional, Tuple
+
+class KLLSketch:
+    """
+    KLL sketch (Karnin, Lang, Liberty 2016) over a stream of floats.
+
+    Items live in levels of compactors; an item on level h stands for 2**h input values. When a level
+    overflows it is sorted and every other item (random offset) is promoted, halving it. Memory is
+    O(k) items, and the normalised rank error is roughly 1.7 / k (about 1% at k=200, 0.2% at k=1000).
+    Sketches built on separate chunks or processes merge into one with the same guarantee.
+    The offsets come from a generator seeded with random_state (0 by default), so the same values in
+    the same order always give the same sketch and charts stay put across reruns; None seeds it randomly.
+    """
+
+    def __init__(self, k:int = 200, random_state:Optional[int] = 0):
+        """Initialize an empty sketch; larger k means smaller error and more memory"""
+
+        if k < 8:
+            raise ValueError("k must be at least 8")
+
+        self.k = k
+        self.count = 0
+        self.min = float("inf")
+        self.max = float("-inf")
+        self.levels = [np.empty(0, dtype=np.float64)]
+        self._rng = np.random.default_rng(random_state)
+
+    @classmethod
+    def from_values(cls, values, k:int = 200, random_state:Optional[int] = 0) -> "KLLSketch":
+        """Build a sketch from one batch of values"""
+
+        sketch = cls(k, random_state)
+        sketch.update(values)
+        return sketch
+
+    @property
+    def error(self) -> float:
+        """Approximate normalised rank error of this sketch's quantiles"""
+
+        return 1.7 / self.k
+
+    def to_state(self) -> dict:
+        """Plain JSON-serialisable state (see from_state)"""
+
+        return {"k": self.k, "count": self.count, "min": self.min, "max": self.max,
+                "levels": [level.tolist() for level in self.levels]}
+
+    @classmethod
+    def from_state(cls, state:dict, random_state:Optional[int] = 0) -> "KLLSketch":
+        """Rebuild a sketch from to_state() output"""
+
+        sketch = cls(state["k"], random_state)
+        sketch.count, sketch.min, sketch.max = state["count"], state["min"], state["max"]
+        sketch.levels = [np.asarray(level, dtype=np.float64) for level in state["levels"]]
+        return sketch
+
+    def _capacity(self, level:int) -> int:
+        """Lower levels get geometrically smaller buffers (c = 2/3), the top level gets k"""
+
+        depth = len(self.levels) - level - 1
+        return max(2, int(np.ceil(self.k * (2 / 3) ** depth)))
+
+    def update(self, values) -> "KLLSketch":
+        """Add a batch of values (NaN is ignored)"""
+
+        values = np.asarray(values, dtype=np.float64).ravel()
+        values = values[~np.isnan(values)]
+        if values.size == 0:
+            return self
+
+        self.count += int(values.size)
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+        return self
+
+    def _compress(self):
+        """Compact overflowing levels, lowest first, until every level fits its capacity"""
+
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if items.size <= self._capacity(level):
+                level += 1
+                continue
+
+            if level + 1 == len(self.levels):
+                self.levels.append(np.empty(0, dtype=np.float64))
+
+            items = np.sort(items)
+            keep = items[:items.size % 2] #an odd item out stays behind at its own weight
+            paired = items[items.size % 2:]
+            promoted = paired[self._rng.integers(2)::2]
+
+            self.levels[level] = keep
+            self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+            level = 0 #adding a level shrinks every lower capacity, so re-check from the bottom
+
+    def merge(self, other:"KLLSketch") -> "KLLSketch":
+        """Combine two sketches into a new one (the inputs are left untouched)"""
+
+        merged = KLLSketch(min(self.k, other.k))
+        merged._rng = self._rng
+        merged.count = self.count + other.count
+        merged.min = min(self.min, other.min)
+        merged.max = max(self.max, other.max)
+
+        depth = max(len(self.levels), len(other.levels))
+        merged.levels = [
+            np.concatenate([
+                self.levels[h] if h < len(self.levels) else np.empty(0),
+                other.levels[h] if h < len(other.levels) else np.empty(0)
+            ])
+            for h in range(depth)
+        ]
+        merged._compress()
+        return merged
+
+    def _weighted(self) -> Tuple[np.ndarray, np.ndarray]:
+        """All retained items sorted, with the cumulative weight up to and including each"""
+
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(level.size, 2**h, dtype=np.int64) for h, level in enumerate(self.levels)])
+        order = np.argsort(items, kind="stable")
+        return items[order], np.cumsum(weights[order])
+
+    def quantiles(self, qs:Iterable[float]) -> List[float]:
+        """Approximate values at the given fractions (0 = min, 1 = max, both exact)"""
+
+        qs = list(qs)
+        if self.count == 0:
+            return [float("nan")] * len(qs)
+
+        items, cumulative = self._weighted()
+        total = cumulative[-1]
+        results = []
+        for q in qs:
+            if q <= 0:
+                results.append(self.min)
+            elif q >= 1:
+                results.append(self.max)
+            else:
+                results.append(float(items[min(np.searchsorted(cumulative, q * total), items.size - 1)]))
+        return results
+
+    def quantile(self, q:float) -> float:
+        """Approximate value at fraction q"""
+
+        return self.quantiles([q])[0]
+
+    def rank(self, value:float, inclusive:bool = True) -> int:
+        """Approximate number of values <= value (< value when inclusive is False)"""
+
+        # Compaction promotes pairs at double weight, so retained weights always sum to count exactly
+        if inclusive:
+            return sum(int(np.count_nonzero(level <= value)) << h for h, level in enumerate(self.levels))
+        return sum(int(np.count_nonzero(level < value)) << h for h, level in enumerate(self.levels))
+
+    def iqr_outliers(self, whisker:float = 1.5) -> Tuple[int, float, float]:
+        """Approximate count of values outside [q1 - whisker*IQR, q3 + whisker*IQR], with both fences"""
+
+        q1, q3 = self.quantiles([0.25, 0.75])
+        low, high = q1 - whisker * (q3 - q1), q3 + whisker * (q3 - q1)
+        outside = self.rank(low, inclusive=False) + self.count - self.rank(high)
+        return max(0, outside), low, high
+
+    def histogram(self, bins:int = 20) -> Tuple[np.ndarray, np.ndarray]:
+        """Approximate counts over `bins` equal-width bins between the exact min and max, with the edges"""
+
+        if self.count == 0:
+            return np.zeros(bins, dtype=np.int64), np.linspace(0.0, 1.0, bins + 1)
+
+        edges = np.linspace(self.min, self.max, bins + 1)
+        if self.min == self.max:
+            counts = np.zeros(bins, dtype=np.int64)
+            counts[0] = self.count
+            return counts, edges
+
+        below = np.array([self.rank(edge, inclusive=False) for edge in edges[:-1]] + [self.count])
+        return np.diff(below), edges
+
+if __name__ == "__main__":
+
+    import time
+
+    values = np.random.lognormal(mean=5, sigma=1, size=2_000_000)
+
+    # Four chunks sketched independently, then merged, as a streaming ingest would do
+    start = time.perf_counter()
+    parts = [KLLSketch.from_values(chunk, k=400, random_state=0) for chunk in np.array_split(values, 4)]
+    sketch = parts[0].merge(parts[1]).merge(parts[2]).merge(parts[3])
+    print(f"sketched {sketch.count:,} values in {time.perf_counter() - start:.2f}s, "
+          f"{sum(level.size for level in sketch.levels):,} items kept")
+
+    start = time.perf_counter()
+    q1, median, q3 = sketch.quantiles([0.25, 0.5, 0.75])
+    outliers, low, high = sketch.iqr_outliers()
+    print(f"queries: {(time.perf_counter() - start) * 1e3:.2f} ms")
+
+    exact = np.quantile(values, [0.25, 0.5, 0.75])
+    exact_outliers = int(((values < low) | (values > high)).sum())
+    print(f"sketch: q1={q1:.2f} median={median:.2f} q3={q3:.2f} outliers={outliers:,}")
+    print(f"exact:  q1={exact[0]:.2f} median={exact[1]:.2f} q3={exact[2]:.2f} outliers={exact_outliers:,}")
@@ -0,0 +1,388 @@
+"""
+Module: query_engine.py
+Purpose: Answer common analytical questions locally by parsing them into vectorised groupby/filter plans
+"""
+
+import re
+import pandas as pd
+import numpy as np
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
+
+AGGREGATES = {
+    "total": "sum", "sum": "sum", "sum of": "sum",
+    "average": "mean", "avg": "mean", "mean": "mean",
+    "median": "median",
+    "max": "max", "maximum": "max", "highest": "max", "largest": "max",
+    "min": "min", "minimum": "min", "lowest": "min", "smallest": "min",
+    "count": "count", "count of": "count", "number of": "count"
+}
+AGG_PATTERN = "|".join(sorted((re.escape(word) for word in AGGREGATES), key=len, reverse=True))
+PREFIX = r"^(?:what(?: is|'s| are)|show(?: me)?|give me|list|tell me|calculate|compute|find)?\s*(?:the\s+)?"
+ROW_WORDS = {"records", "rows", "entries", "lines", "transactions", "orders", "sales records"}
+
+TOP = re.compile(PREFIX + r"(top|bottom)\s+(\d+)\s+(.+?)\s+by\s+(.+)$")
+GROUPED = re.compile(PREFIX + rf"({AGG_PATTERN})\s+(?:of\s+)?(.+?)\s+(?:by|per|for each|across)\s+(.+)$")
+FILTERED = re.compile(PREFIX + rf"({AGG_PATTERN})\s+(?:of\s+)?(.+?)\s+(?:for|in|where|when|among|of)\s+(.+)$")
+OVERALL = re.compile(PREFIX + rf"({AGG_PATTERN})\s+(?:of\s+)?(.+)$")
+HOW_MANY = re.compile(r"^how many\s+(?:distinct\s+|unique\s+|different\s+)?(.+?)(?:\s+(?:are there|do we have|exist|are in the data))?$")
+CONDITION = re.compile(r"^(.+?)\s*(?:=|==|\bis\b|\bequals\b)\s*(.+)$")
+
+def _normalise(text:str) -> str:
+    """Lower-case and drop everything but letters and digits ("Units_Sold" -> "unitssold")"""
+
+    return re.sub(r"[^a-z0-9]", "", str(text).lower())
+
+def _format(value) -> str:
+    """Readable number"""
+
+    if isinstance(value, (int, np.integer)):
+        return f"{value:,}"
+    if isinstance(value, (float, np.floating)):
+        return "n/a" if np.isnan(value) else f"{value:,.2f}"
+    return str(value)
+
+class QueryEngine:
+    """Parse questions into plans, run them with pandas (or a RollupCube) and cache the results"""
+
+    def __init__(self, df:pd.DataFrame, rollup=None, filter_index=None, stats=None, sample_of:Optional[int] = None,
+                 cache_size:int = 128, max_categories:int = 1_000):
+        """
+        Initialize QueryEngine over a frame. `filter_index` (FilterIndex) is an optional row index of this frame.
+        `rollup` (RollupCube) and `stats` (DatasetStats) are optional aggregates of the full dataset; sum, mean
+        and count plans they cover are answered from them. When `df` is only a sample of that dataset,
+        `sample_of` is the full row count and every answer that has to come from the sample says so.
+        """
+
+        self.df = df
+        self.rollup = rollup
+        self.stats = stats
+        self.sample_of = sample_of
+        self.filter_index = filter_index if filter_index is not None and filter_index.df is df else None
+        self.cache_size = cache_size
+        self.max_categories = max_categories
+
+        self.numeric_cols = df.select_dtypes(include=[np.number]).columns.tolist()
+        self.text_cols = df.select_dtypes(exclude=[np.number, "datetime", "datetimetz", "timedelta"]).columns.tolist()
+        self._columns = {_normalise(column): column for column in df.columns}
+        self._values = None #normalised category value -> (column, value), built on first use
+        self._cache = OrderedDict()
+
+    # --- Parsing ---
+
+    def _column(self, phrase:str, numeric:Optional[bool] = None) -> Optional[str]:
+        """Resolve a phrase ("units sold", "products") to a column name"""
+
+        key = _normalise(phrase)
+        if not key:
+            return None
+
+        candidates = self._columns
+        if numeric is True:
+            candidates = {k: c for k, c in candidates.items() if c in self.numeric_cols}
+        elif numeric is False:
+            candidates = {k: c for k, c in candidates.items() if c in self.text_cols}
+
+        for variant in (key, key[:-1] if key.endswith("s") else None, key[:-2] if key.endswith("es") else None):
+            if variant and variant in candidates:
+                return candidates[variant]
+
+        # Partial match ("sales" -> "Total_Sales"), only when it is unambiguous
+        partial = [column for k, column in candidates.items() if key in k or (len(k) > 2 and k in key)]
+        return partial[0] if len(partial) == 1 else None
+
+    def _value(self, phrase:str) -> Optional[Tuple[str, Any]]:
+        """Resolve a phrase to (column, value), e.g. "region is north", "north" or "laptops" """
+
+        condition = CONDITION.match(phrase)
+        if condition:
+            column = self._column(condition.group(1))
+            if column is not None:
+                wanted = _normalise(condition.group(2))
+                for value in self._distinct(column):
+                    if _normalise(value) == wanted:
+                        return column, value
+                return None
+
+        if self._values is None:
+            self._values = {}
+            for column in self.text_cols:
+                for value in self._distinct(column):
+                    self._values.setdefault(_normalise(value), (column, value))
+
+        key = _normalise(phrase)
+        for variant in (key, key[:-1] if key.endswith("s") else None):
+            if variant and variant in self._values:
+                return self._values[variant]
+        return None
+
+    def _distinct(self, column:str) -> list:
+        """Distinct values of a low-cardinality text column (empty for ID-like columns)"""
+
+        if self.filter_index is not None:
+            values = self.filter_index.values(column)
+        else:
+            values = self.df[column].dropna().unique()
+        return list(values) if len(values) <= self.max_categories else []
+
+    def parse(self, question:str) -> Optional[Dict[str, Any]]:
+        """Turn a question into a plan dict, or None if it is open-ended"""
+
+        q = re.sub(r"\s+", " ", question.lower().strip().rstrip("?.! ")).strip()
+
+        if "missing" in q or "null" in q:
+            return {"op": "missing"}
+        if "duplicate" in q:
+            return {"op": "duplicates"}
+        if q in ("summary", "summarize", "summarise", "overview") or q.endswith(" summary"):
+            return {"op": "summary"}
+
+        match = TOP.match(q)
+        if match:
+            direction, n, dim_phrase, measure_phrase = match.groups()
+            dim_phrase, condition = self._split_condition(dim_phrase)
+            agg = "sum"
+            agg_match = re.match(rf"^({AGG_PATTERN})\s+(?:of\s+)?(.+)$", measure_phrase)
+            if agg_match:
+                agg, measure_phrase = AGGREGATES[agg_match.group(1)], agg_match.group(2)
+
+            by, measure = self._column(dim_phrase, numeric=False), self._column(measure_phrase, numeric=True)
+            if by is not None and measure is not None and condition is not False:
+                return {"op": "aggregate", "agg": agg, "measure": measure, "by": by, "filter": condition,
+                        "top": int(n), "ascending": direction == "bottom"}
+
+        for pattern in (GROUPED, FILTERED, OVERALL):
+            match = pattern.match(q)
+            if not match:
+                continue
+
+            agg = AGGREGATES[match.group(1)]
+            measure = self._column(match.group(2), numeric=True)
+            rows = agg == "count" and (match.group(2) in ROW_WORDS or measure is None)
+
+            if pattern is GROUPED:
+                dim_phrase, condition = self._split_condition(match.group(3))
+                by = self._column(dim_phrase, numeric=False)
+                if by is None or condition is False:
+                    continue
+                plan = {"by": by, "filter": condition}
+            elif pattern is FILTERED:
+                condition = self._value(match.group(3))
+                if condition is None:
+                    continue
+                plan = {"by": None, "filter": condition}
+            else:
+                plan = {"by": None, "filter": None}
+
+            if rows:
+                return {"op": "count", **plan}
+            if measure is not None:
+                return {"op": "aggregate", "agg": agg, "measure": measure, "top": None, "ascending": False, **plan}
+
+        match = HOW_MANY.match(q)
+        if match:
+            phrase, condition = self._split_condition(match.group(1))
+            if condition is False:
+                return None
+            if phrase in ROW_WORDS:
+                return {"op": "count", "by": None, "filter": condition}
+
+            column = self._column(phrase, numeric=False)
+            if column is not None:
+                return {"op": "distinct", "column": column, "filter": condition}
+
+        if q in ("average", "mean", "averages", "means") or q.startswith(("what are the averages", "show averages")):
+            return {"op": "describe"}
+        return None
+
+    def _split_condition(self, phrase:str):
+        """Split "region for laptop" into ("region", (column, value)); False if the condition does not resolve"""
+
+        parts = re.split(r"\s+(?:for|in|where|when|among)\s+", phrase, maxsplit=1)
+        if len(parts) == 1:
+            return phrase, None
+        condition = self._value(parts[1])
+        return parts[0], condition if condition is not None else False
+
+    # --- Execution ---
+
+    def answer(self, question:str) -> Optional[Dict[str, Any]]:
+        """
+        Answer a question locally. Returns {"answer": text, "result": value/Series, "plan": plan, "cached": bool},
+        or None when the question is open-ended and should go to the LLM.
+        """
+
+        plan = self.parse(question)
+        if plan is None:
+            return None
+
+        key = tuple(sorted(plan.items()))
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            return {**self._cache[key], "cached": True}
+
+        result = self._from_aggregates(plan)
+        sampled = False
+        if result is None:
+            result = self.execute(plan)
+            sampled = self.sample_of is not None
+
+        answer = self._describe(plan, result)
+        if sampled:
+            answer += f"\n\n(Computed on the {len(self.df):,}-row working sample only, not all {self.sample_of:,} rows.)"
+        response = {"answer": answer, "result": result, "plan": plan, "sampled": sampled}
+
+        self._cache[key] = response
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return {**response, "cached": False}
+
+    def _frame(self, condition) -> pd.DataFrame:
+        """Rows matching a (column, value) condition, through the filter index when available"""
+
+        if condition is None:
+            return self.df
+        column, value = condition
+        if self.filter_index is not None:
+            return self.filter_index.filter(column, value)
+        return self.df[self.df[column] == value]
+
+    def _from_aggregates(self, plan:Dict[str, Any]):
+        """Serve sum/mean/count plans from the full-dataset stats or rollup cube (None if they cannot answer)"""
+
+        if plan["op"] not in ("aggregate", "count"):
+            return None
+
+        # Whole-dataset figures: running column stats
+        stats = self.stats
+        if stats is not None and plan["by"] is None and plan["filter"] is None:
+            if plan["op"] == "count":
+                return int(stats.rows)
+            column = stats.numeric.get(plan["measure"])
+            if column is not None and plan["agg"] in ("sum", "mean", "count", "min", "max"):
+                if plan["agg"] == "count":
+                    return int(column.count)
+                return float(getattr(column, plan["agg"])) if column.count else np.nan
+
+        cube = self.rollup
+        if cube is None:
+            return None
+        if plan["op"] == "aggregate" and (plan["agg"] not in ("sum", "mean", "count") or plan["measure"] not in cube.measures):
+            return None
+
+        by, condition = plan["by"], plan["filter"]
+        if by is not None and condition is None and by in cube.rows:
+            if plan["op"] == "count":
+                return cube.rows[by].sort_values(ascending=False)
+            sums, counts = cube.sums[by][plan["measure"]], cube.counts[by][plan["measure"]]
+        elif by is None and condition is not None and condition[0] in cube.rows:
+            column, value = condition
+            if plan["op"] == "count":
+                return int(cube.rows[column].get(value, 0))
+            if value not in cube.sums[column].index:
+                return None
+            sums, counts = cube.sums[column].loc[value, plan["measure"]], cube.counts[column].loc[value, plan["measure"]]
+        else:
+            return None
+
+        agg = plan["agg"]
+        if agg == "sum":
+            result = sums
+        elif agg == "count":
+            result = counts.astype(np.int64) if isinstance(counts, pd.Series) else int(counts)
+        else:
+            with np.errstate(invalid="ignore", divide="ignore"):
+                result = sums / counts
+
+        if isinstance(result, pd.Series):
+            result = result.sort_values(ascending=plan["ascending"])
+            if plan["top"]:
+                result = result.head(plan["top"])
+        return result
+
+    def execute(self, plan:Dict[str, Any]):
+        """Run a plan and return a scalar, Series or dict"""
+
+        op = plan["op"]
+        if op == "missing":
+            missing = self.df.isna().sum()
+            return missing[missing > 0].sort_values(ascending=False)
+        if op == "duplicates":
+            return int(self.df.duplicated().sum())
+        if op == "summary":
+            return {"rows": len(self.df), "columns": self.df.shape[1], "missing cells": int(self.df.isna().sum().sum())}
+        if op == "describe":
+            return self.df[self.numeric_cols].mean()
+
+        frame = self._frame(plan.get("filter"))
+        if op == "distinct":
+            return int(frame[plan["column"]].nunique())
+        if op == "count":
+            if plan["by"] is None:
+                return len(frame)
+            return frame.groupby(plan["by"], observed=True, sort=False).size().sort_values(ascending=False)
+
+        measure, agg = plan["measure"], plan["agg"]
+        if plan["by"] is None:
+            return frame[measure].agg(agg)
+
+        grouped = frame.groupby(plan["by"], observed=True, sort=False)[measure].agg(agg)
+        if plan["top"]:
+            return grouped.nsmallest(plan["top"]) if plan["ascending"] else grouped.nlargest(plan["top"])
+        return grouped.sort_values(ascending=False)
+
+    def _describe(self, plan:Dict[str, Any], result) -> str:
+        """Plain-language answer"""
+
+        op = plan["op"]
+        where = f" for {plan['filter'][0]} = {plan['filter'][1]}" if plan.get("filter") else ""
+
+        if op == "missing":
+            if result.empty:
+                return "No missing values found."
+            return "Missing values per column:\n" + "\n".join(f"- {column}: {_format(count)}" for column, count in result.items())
+        if op == "duplicates":
+            return f"The dataset contains {_format(result)} duplicate rows."
+        if op == "summary":
+            return ", ".join(f"{_format(value)} {name}" for name, value in result.items()) + "."
+        if op == "describe":
+            return "Averages:\n" + "\n".join(f"- {column}: {_format(value)}" for column, value in result.items())
+        if op == "distinct":
+            return f"There are {_format(result)} distinct {plan['column']} values{where}."
+
+        if op == "count":
+            title = f"Records{where}"
+        else:
+            label = {"sum": "Total", "mean": "Average", "median": "Median", "max": "Maximum", "min": "Minimum", "count": "Count of"}[plan["agg"]]
+            title = f"{label} {plan['measure']}{where}"
+
+        if not isinstance(result, pd.Series):
+            return f"{title}: {_format(result)}"
+
+        rank = f"{'Bottom' if plan.get('ascending') else 'Top'} {plan['top']} " if plan.get("top") else ""
+        lines = [f"- {index}: {_format(value)}" for index, value in result.head(10).items()]
+        more = f"\n(+{len(result) - 10} more)" if len(result) > 10 else ""
+        return f"{rank}{title} by {plan['by']}:\n" + "\n".join(lines) + more
+
+if __name__ == "__main__":
+
+    import time
+
+    n = 500_000
+    df = pd.DataFrame({
+        "Region": np.random.choice(["North", "South", "East", "West"], n),
+        "Product": np.random.choice(["Laptop", "Mouse", "Keyboard", "Monitor", "Headphones"], n),
+        "Sales": np.random.randint(100, 5000, n),
+        "Units_Sold": np.random.randint(1, 100, n),
+        "Profit": np.random.uniform(10.0, 500.0, n).round(2)
+    })
+    engine = QueryEngine(df)
+
+    for question in ("Total Sales by Region", "average Profit for Laptop", "top 3 products by Units_Sold",
+                     "How many records are there?", "total sales by product in north", "Which region should we expand into?"):
+        start = time.perf_counter()
+        response = engine.answer(question)
+        elapsed = (time.perf_counter() - start) * 1e3
+        print(f"Q: {question}  ({elapsed:.1f} ms)")
+        print(response["answer"] if response else "-> open-ended, send to the LLM")
+        print()
@@ -0,0 +1,168 @@
+"""
+Module: sampling.py
+Purpose: Single-pass reservoir sampling (uniform or stratified) for streamed datasets
+"""
+
+import pandas as pd
+import numpy as np
+from typing import Optional
+
+class ReservoirSampler:
+    """Keep a fixed-size uniform random sample of a stream of DataFrame chunks (Algorithm R)"""
+
+    def __init__(self, size:int = 10_000, random_state:Optional[int] = 42):
+        """Initialize ReservoirSampler with the sample size and seed"""
+
+        if size <= 0:
+            raise ValueError("Sample size must be positive.")
+
+        self.size = size
+        self.seen = 0
+        self._rng = random_state if isinstance(random_state, np.random.Generator) else np.random.default_rng(random_state)
+
+        self._reservoir = None #row i of the reservoir lives in slot self._slots[i]
+        self._slots = np.empty(0, dtype=np.int64)
+        self._positions = np.empty(0, dtype=np.int64) #stream position of each kept row, used to restore file order
+
+    def update(self, chunk:pd.DataFrame, positions:Optional[np.ndarray] = None):
+        """Offer every row of a chunk to the reservoir"""
+
+        n = len(chunk)
+        if n == 0:
+            return
+
+        if positions is None:
+            positions = np.arange(self.seen, self.seen + n, dtype=np.int64)
+
+        # The i-th row of the stream takes slot i while filling, then replaces slot j ~ U[0, i] when j < size
+        stream_index = np.arange(self.seen, self.seen + n, dtype=np.int64)
+        slots = np.where(stream_index < self.size, stream_index, self._rng.integers(0, stream_index + 1))
+        self.seen += n
+
+        accepted = np.flatnonzero(slots < self.size)
+        if accepted.size == 0:
+            return
+
+        # Within one chunk a later row overwrites an earlier one in the same slot
+        reversed_slots = slots[accepted][::-1]
+        new_slots, first = np.unique(reversed_slots, return_index=True)
+        rows = accepted[::-1][first]
+
+        incoming = chunk.iloc[rows]
+        if self._reservoir is None:
+            keep = np.empty(0, dtype=np.int64)
+            combined = incoming
+        else:
+            keep = np.flatnonzero(~np.isin(self._slots, new_slots))
+            combined = pd.concat([self._reservoir.iloc[keep], incoming])
+
+        all_slots = np.concatenate([self._slots[keep], new_slots])
+        all_positions = np.concatenate([self._positions[keep], positions[rows]])
+
+        order = np.argsort(all_slots, kind="stable")
+        self._reservoir = combined.iloc[order]
+        self._slots = all_slots[order]
+        self._positions = all_positions[order]
+
+    def get_kept_rows(self):
+        """Get the kept rows together with their stream positions"""
+
+        return self._reservoir, self._positions
+
+    def get_sample(self) -> Optional[pd.DataFrame]:
+        """Get the sample in original stream order"""
+
+        if self._reservoir is None:
+            return None
+
+        order = np.argsort(self._positions, kind="stable")
+        return self._reservoir.iloc[order].reset_index(drop=True)
+
+class StratifiedReservoirSampler:
+    """Reservoir sample per stratum, combined in proportion to each stratum's share of the stream"""
+
+    def __init__(self, column:str, size:int = 10_000, random_state:Optional[int] = 42, max_strata:int = 200):
+        """Initialize StratifiedReservoirSampler with the stratifying column, sample size and seed"""
+
+        if size <= 0:
+            raise ValueError("Sample size must be positive.")
+
+        self.column = column
+        self.size = size
+        self.max_strata = max_strata #each stratum holds up to `size` rows, so this bounds memory
+        self.seen = 0
+        self._rng = np.random.default_rng(random_state)
+        self._strata = {}
+
+    def update(self, chunk:pd.DataFrame):
+        """Route every row of a chunk to its stratum's reservoir"""
+
+        if self.column not in chunk.columns:
+            raise ValueError(f"Stratify column '{self.column}' not found in data.")
+
+        positions = np.arange(self.seen, self.seen + len(chunk), dtype=np.int64)
+        self.seen += len(chunk)
+
+        for stratum, rows in chunk.groupby(self.column, dropna=False, sort=False).indices.items():
+            stratum = None if pd.isna(stratum) else stratum #NaN keys never compare equal across chunks
+
+            if stratum not in self._strata:
+                if len(self._strata) >= self.max_strata:
+                    raise ValueError(f"Column '{self.column}' has more than {self.max_strata} distinct values; choose a categorical column to stratify by.")
+                self._strata[stratum] = ReservoirSampler(self.size, random_state=self._rng)
+
+            self._strata[stratum].update(chunk.iloc[rows], positions=positions[rows])
+
+    def _allocate(self):
+        """Split the sample size across strata proportionally (largest remainder method)"""
+
+        counts = np.array([sampler.seen for sampler in self._strata.values()], dtype=np.float64)
+        total = counts.sum()
+
+        if total <= self.size:
+            return counts.astype(np.int64)
+
+        quotas = counts / total * self.size
+        alloc = np.floor(quotas).astype(np.int64)
+        remainder = self.size - alloc.sum()
+        alloc[np.argsort(quotas - alloc, kind="stable")[::-1][:remainder]] += 1
+        return alloc
+
+    def get_sample(self) -> Optional[pd.DataFrame]:
+        """Get the stratified sample in original stream order"""
+
+        if not self._strata:
+            return None
+
+        frames = []
+        positions = []
+        for sampler, take in zip(self._strata.values(), self._allocate()):
+            reservoir, kept_positions = sampler.get_kept_rows()
+            if take < len(reservoir):
+                # A random subset of a uniform sample is still uniform within the stratum
+                pick = np.sort(self._rng.choice(len(reservoir), size=take, replace=False))
+                reservoir, kept_positions = reservoir.iloc[pick], kept_positions[pick]
+            frames.append(reservoir)
+            positions.append(kept_positions)
+
+        sample = pd.concat(frames)
+        order = np.argsort(np.concatenate(positions), kind="stable")
+        return sample.iloc[order].reset_index(drop=True)
+
+if __name__ == "__main__":
+
+    df = pd.DataFrame({
+        "Region": np.random.choice(["North", "South", "East", "West"], 100_000, p=[0.7, 0.1, 0.1, 0.1]),
+        "Sales": np.arange(100_000)
+    })
+
+    uniform = ReservoirSampler(size=1_000)
+    stratified = StratifiedReservoirSampler("Region", size=1_000)
+
+    for start in range(0, len(df), 10_000):
+        chunk = df.iloc[start:start + 10_000]
+        uniform.update(chunk)
+        stratified.update(chunk)
+
+    print(f"Uniform mean position: {uniform.get_sample()['Sales'].mean():,.0f} (expected ~50,000)")
+    print(f"Stratified shares:\n{stratified.get_sample()['Region'].value_counts(normalize=True)}")
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Tests import the app modules the same way the pages do (src.*, utils.*)
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
@@ -0,0 +1,193 @@
+import contextlib
+import importlib.util
+import os
+import sys
+import time
+import types
+
+import pytest
+
+from utils.model_router import ModelRouter
+from utils.response_cache import ResponseCache
+
+AI_HELPER = os.path.join(os.path.dirname(__file__), "..", "utils", "ai_helper.py")
+
+
+class StubClient:
+    """
+    Stands in for InferenceClient: answers after `delay` seconds, or raises if `fail`. Streamed answers
+    are `tokens` (raising after `fail_after` of them, if set); `closed` records that a stream was closed.
+    """
+
+    def __init__(self, model_id, delay=0.0, fail=False, tokens=None, fail_after=None):
+        self.model_id = model_id
+        self.delay = delay
+        self.fail = fail
+        self.tokens = tokens or ["answer ", "from ", model_id]
+        self.fail_after = fail_after
+        self.calls = 0
+        self.closed = False
+
+    def chat_completion(self, messages, stream=False, **params):
+        self.calls += 1
+        time.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError(f"{self.model_id} is busy")
+        if stream:
+            return self._stream()
+        text = f"answer from {self.model_id}"
+        return types.SimpleNamespace(choices=[types.SimpleNamespace(message=types.SimpleNamespace(content=text))])
+
+    def _stream(self):
+        try:
+            yield types.SimpleNamespace(choices=[]) # role-only chunks carry no text
+            for i, token in enumerate(self.tokens):
+                if i == self.fail_after:
+                    raise RuntimeError("connection reset")
+                yield types.SimpleNamespace(choices=[types.SimpleNamespace(delta=types.SimpleNamespace(content=token))])
+        finally:
+            self.closed = True
+
+
+@pytest.fixture
+def ai_helper(monkeypatch):
+    # The real client libraries are not needed: every call goes to a StubClient
+    for name, attributes in (("huggingface_hub", {"InferenceClient": StubClient}), ("dotenv", {"load_dotenv": lambda: None})):
+        try:
+            importlib.import_module(name)
+        except ImportError:
+            monkeypatch.setitem(sys.modules, name, types.SimpleNamespace(**attributes))
+    monkeypatch.setenv("HF_CACHE_TTL", "0")
+
+    spec = importlib.util.spec_from_file_location("ai_helper_under_test", AI_HELPER)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+
+    module.HEDGE_DELAY = "0.05"
+    module.ROUTER = ModelRouter(module.MODELS, failure_threshold=3, cooldown=0.3)
+    module.clients = {}
+    module.get_client = lambda model_id: module.clients[model_id]
+    yield module
+    module._EXECUTOR.shutdown(wait=False, cancel_futures=True)
+
+
+def use(ai_helper, *clients):
+    ai_helper.clients.update({model_id: client for model_id, client in zip(ai_helper.MODELS, clients)})
+    return ai_helper.MODELS
+
+
+def state(ai_helper, model_id):
+    return next(row["state"] for row in ai_helper.ROUTER.snapshot() if row["model"] == model_id)
+
+
+def test_first_completed_response_wins(ai_helper):
+    use(ai_helper, StubClient("slow", delay=1.0), StubClient("fast", delay=0.01), StubClient("spare", delay=1.0))
+
+    start = time.perf_counter()
+    assert ai_helper._hedged(ai_helper._build_messages("q")) == "answer from fast"
+    assert time.perf_counter() - start < 0.5 # did not wait for the slow first tier
+
+
+def test_failing_tier_falls_through(ai_helper):
+    use(ai_helper, StubClient("down", fail=True), StubClient("next", delay=0.1), StubClient("spare", delay=1.0))
+
+    messages = ai_helper._build_messages("q")
+    assert ai_helper._sequential(messages) == "answer from next"
+
+    start = time.perf_counter()
+    assert ai_helper._hedged(messages) == "answer from next"
+    assert time.perf_counter() - start < 0.5
+
+
+@pytest.mark.parametrize("hedge", [True, False])
+def test_breaker_opens_after_failures_and_half_opens_after_cooldown(ai_helper, hedge):
+    down, up = StubClient("down", fail=True), StubClient("up")
+    failing, _, _ = use(ai_helper, down, up, StubClient("spare"))
+    run = ai_helper._hedged if hedge else ai_helper._sequential
+    messages = ai_helper._build_messages("q")
+
+    for _ in range(3):
+        assert run(messages) == "answer from up"
+    assert down.calls == 3
+    assert state(ai_helper, failing) == "open"
+
+    # Open: the failing model is skipped without a call
+    assert run(messages) == "answer from up"
+    assert down.calls == 3
+
+    # Cooldown over: one half-open probe; a failing probe re-opens the breaker at once
+    time.sleep(0.35)
+    assert run(messages) == "answer from up"
+    assert down.calls == 4
+    assert state(ai_helper, failing) == "open"
+
+    # Next cooldown: the recovered model's probe answers (the now faster-ranked tier fails) and closes the breaker
+    time.sleep(0.35)
+    down.fail, up.fail = False, True
+    assert run(messages) == "answer from down"
+    assert down.calls == 5
+    assert state(ai_helper, failing) == "closed"
+
+
+def cached(ai_helper, prompt):
+    return ai_helper.CACHE.get(ai_helper.MODELS, ai_helper._build_messages(prompt)[0]["content"], ai_helper.GENERATION_PARAMS)
+
+
+@pytest.fixture
+def response_cache(ai_helper, tmp_path):
+    ai_helper.CACHE = ResponseCache(path=str(tmp_path / "responses.sqlite3"))
+    return ai_helper.CACHE
+
+
+def test_stream_is_joined_and_cached_only_when_complete(ai_helper, response_cache):
+    use(ai_helper, StubClient("main", tokens=["Grow ", "online ", "", "sales."]), StubClient("b"), StubClient("c"))
+
+    stream = ai_helper.stream_llm_response("q")
+    assert next(stream) == "Grow "
+    assert cached(ai_helper, "q") is None # nothing stored mid-stream
+
+    assert "Grow " + "".join(stream) == "Grow online sales."
+    assert cached(ai_helper, "q") == "Grow online sales."
+    assert list(ai_helper.stream_llm_response("q")) == ["Grow online sales."] # served whole from the cache
+
+
+def test_interrupted_or_abandoned_streams_are_not_cached(ai_helper, response_cache):
+    broken = StubClient("main", tokens=["Grow ", "online ", "sales."], fail_after=2)
+    use(ai_helper, broken, StubClient("b"), StubClient("c"))
+
+    assert "".join(ai_helper.stream_llm_response("q")) == "Grow online " + ai_helper.INTERRUPTED_SUFFIX
+    assert cached(ai_helper, "q") is None
+
+    abandoned = StubClient("main")
+    use(ai_helper, abandoned)
+    stream = ai_helper.stream_llm_response("q2")
+    next(stream)
+    stream.close() # the page stopped reading
+    assert abandoned.closed
+    assert cached(ai_helper, "q2") is None
+
+
+def test_first_token_wins_and_the_losing_stream_is_closed(ai_helper, response_cache):
+    slow, fast = StubClient("slow", delay=0.3), StubClient("fast", delay=0.01)
+    use(ai_helper, slow, fast, StubClient("spare", delay=1.0))
+
+    assert "".join(ai_helper.stream_llm_response("q")) == "answer from fast"
+    time.sleep(0.4)
+    assert slow.closed
+    assert cached(ai_helper, "q") == "answer from fast"
+
+
+def test_stream_text_card_draws_the_joined_text(monkeypatch):
+    pytest.importorskip("streamlit")
+    pytest.importorskip("streamlit_lottie")
+    from utils import ui
+
+    class Placeholder:
+        def container(self):
+            return contextlib.nullcontext()
+
+    drawn = []
+    monkeypatch.setattr(ui, "text_card", lambda title, text: drawn.append(text))
+
+    assert ui.stream_text_card("Answer", iter(["Grow ", "online ", "sales."]), Placeholder(), refresh=0) == "Grow online sales."
+    assert drawn == ["Grow  ▌", "Grow online  ▌", "Grow online sales. ▌", "Grow online sales."]
@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.cardinality import ColumnCardinality, HyperLogLog
+
+
+def chunked(values, chunksize, exact_limit=1_000):
+    parts = [ColumnCardinality.from_values(values[start:start + chunksize], exact_limit=exact_limit)
+             for start in range(0, len(values), chunksize)]
+    merged = parts[0]
+    for part in parts[1:]:
+        merged = merged.merge(part)
+    return merged
+
+
+def test_small_columns_are_exact():
+    rng = np.random.default_rng(4)
+    values = pd.Series(rng.choice(["North", "South", "East", None], 10_000))
+    counter = chunked(values, 999)
+    assert counter.is_exact
+    assert counter.count() == values.nunique()
+    assert counter.distinct_values() == values.dropna().unique().tolist()
+
+
+@pytest.mark.parametrize("distinct", [5_000, 200_000])
+def test_wide_columns_are_estimated(distinct):
+    rng = np.random.default_rng(distinct)
+    values = pd.Series(rng.integers(0, distinct, 300_000)).astype(str)
+    counter = chunked(values, 50_000)
+    assert not counter.is_exact
+    assert counter.distinct_values() is None
+    assert counter.count() == pytest.approx(values.nunique(), rel=4 * 1.04 / np.sqrt(2**12))
+
+
+def test_merge_matches_single_pass():
+    values = pd.Series(np.arange(3_000) % 700)
+    assert chunked(values, 250, exact_limit=1_000).count() == values.nunique()
+    assert chunked(values, 250, exact_limit=500).count() == pytest.approx(values.nunique(), rel=0.1)
+
+
+def test_hyperloglog_merge_is_register_max():
+    hashes = pd.util.hash_array(np.arange(10_000))
+    whole = HyperLogLog().update_hashes(hashes)
+    halves = HyperLogLog().update_hashes(hashes[:6_000]).merge(HyperLogLog().update_hashes(hashes[4_000:]))
+    np.testing.assert_array_equal(whole.registers, halves.registers)
+    with pytest.raises(ValueError):
+        HyperLogLog(10).merge(HyperLogLog(12))
@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.correlation import CorrelationAccumulator
+
+
+@pytest.fixture
+def df():
+    rng = np.random.default_rng(6)
+    n = 20_000
+    base = rng.normal(1e6, 50, n) # large offset: naive sums would lose precision
+    df = pd.DataFrame({
+        "a": base,
+        "b": base * 0.5 + rng.normal(0, 30, n),
+        "c": rng.integers(0, 100, n),
+        "d": -base + rng.normal(0, 10, n),
+        "constant": np.full(n, 7.0)
+    })
+    df.loc[rng.random(n) < 0.2, "b"] = np.nan
+    df.loc[rng.random(n) < 0.05, "d"] = np.nan
+    return df
+
+
+@pytest.mark.parametrize("chunksize", [1_000, 7_777, 50_000])
+def test_matches_pandas_corr(df, chunksize):
+    result = CorrelationAccumulator.from_frame(df, chunksize=chunksize).corr()
+    pd.testing.assert_frame_equal(result, df.corr(), atol=1e-9, check_exact=False)
+
+
+def test_float32_is_close(df):
+    result = CorrelationAccumulator.from_frame(df, chunksize=5_000, dtype=np.float32).corr()
+    pd.testing.assert_frame_equal(result, df.corr(), atol=1e-4, check_exact=False)
+
+
+def test_merge_equals_single_pass(df):
+    columns = df.columns.tolist()
+    shift = df.iloc[:1_000].mean().to_numpy()
+    left = CorrelationAccumulator(columns, shift).update(df.iloc[:8_000])
+    right = CorrelationAccumulator(columns, shift).update(df.iloc[8_000:])
+    pd.testing.assert_frame_equal(left.merge(right).corr(), df.corr(), atol=1e-9, check_exact=False)
+
+
+def test_min_periods(df):
+    sparse = df.iloc[:5].copy()
+    sparse.loc[sparse.index[:4], "b"] = np.nan
+    result = CorrelationAccumulator.from_frame(sparse).corr(min_periods=3)
+    pd.testing.assert_frame_equal(result, sparse.corr(min_periods=3), atol=1e-9, check_exact=False)
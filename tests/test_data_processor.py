@@ -0,0 +1,53 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data_processor import DataProcessor
+
+
+@pytest.fixture
+def csv_bytes():
+    rng = np.random.default_rng(9)
+    n = 2_000
+    df = pd.DataFrame({
+        "Region": rng.choice(["North", "South", "East"], n),
+        "Date": rng.choice(["2024-1-5", "2024-01-06", "2024-02-10 08:00"], n),
+        "Units": rng.integers(0, 200, n),
+        "Price": rng.integers(1, 50, n) / 4,
+        "Notes": [None] * n
+    })
+    df.iloc[::50] = None
+    df.iloc[1::50] = df.iloc[2::50].to_numpy()
+    return df.to_csv(index=False).encode()
+
+
+@pytest.mark.parametrize("clean", [False, True])
+def test_original_file_undoes_optimize(csv_bytes, clean):
+    processor = DataProcessor()
+    processor.load_data(io.BytesIO(csv_bytes), optimize=True, parallel=False)
+    assert set(processor.memory_report["converted columns"]) >= {"Region", "Date", "Units"}
+    if clean:
+        processor.clean_data()
+
+    pd.testing.assert_frame_equal(processor.original_file, pd.read_csv(io.BytesIO(csv_bytes)))
+
+
+def test_optimize_after_clean(csv_bytes):
+    processor = DataProcessor()
+    processor.load_data(io.BytesIO(csv_bytes), parallel=False)
+    processor.clean_data()
+    processor.optimize_dtypes()
+
+    pd.testing.assert_frame_equal(processor.original_file, pd.read_csv(io.BytesIO(csv_bytes)))
+
+
+def test_original_file_is_a_snapshot(csv_bytes):
+    processor = DataProcessor()
+    processor.load_data(io.BytesIO(csv_bytes), parallel=False)
+    original = processor.original_file
+    assert original is not processor.data
+
+    processor.data.loc[0, "Units"] = -1
+    assert original.loc[0, "Units"] != -1
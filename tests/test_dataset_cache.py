@@ -0,0 +1,99 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.dataset_cache import DatasetCache, META_VERSION
+from src.rollup import RollupCube
+from src.running_stats import DatasetStats
+
+
+@pytest.fixture
+def df():
+    rng = np.random.default_rng(5)
+    n = 5_000
+    return pd.DataFrame({
+        "Region": rng.choice(["North", "South", "East"], n),
+        "Product": rng.choice(["Laptop", "Mouse"], n),
+        "Order_ID": np.arange(n).astype(str),
+        "Sales": rng.normal(200, 50, n),
+        "Units_Sold": rng.integers(1, 10, n),
+        2024: rng.integers(0, 3, n)
+    })
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return DatasetCache(cache_dir=str(tmp_path))
+
+
+def test_stats_round_trip(cache, df):
+    stats = DatasetStats.from_frame(df, max_categories=100)
+    cache.put_meta("key", stats, "stats")
+    loaded = cache.get_meta("key", "stats", DatasetStats)
+
+    assert loaded.to_dict() == stats.to_dict()
+    assert loaded.distinct_count("Order_ID") == stats.distinct_count("Order_ID")
+    assert loaded.category_columns() == stats.category_columns()
+    assert loaded.quantiles("Sales", [0.1, 0.5, 0.9]) == stats.quantiles("Sales", [0.1, 0.5, 0.9])
+
+
+def test_rollup_round_trip(cache, df):
+    cube = RollupCube.from_frame(df.iloc[:2_000]).merge(RollupCube.from_frame(df.iloc[2_000:]))
+    cache.put_meta("key", cube, "rollup")
+    loaded = cache.get_meta("key", "rollup", RollupCube)
+
+    assert loaded.excluded == cube.excluded
+    for region in ["North", "South", "East"]:
+        assert loaded.key_metrics("Region", region, "Product") == cube.key_metrics("Region", region, "Product")
+        pd.testing.assert_series_equal(loaded.value_counts("Product", "Region", region),
+                                       cube.value_counts("Product", "Region", region), check_names=False)
+    for dimension in cube.sums:
+        pd.testing.assert_frame_equal(loaded.sums[dimension], cube.sums[dimension], check_index_type=False)
+
+
+def test_mismatched_entries_are_misses(cache, df):
+    stats = DatasetStats.from_frame(df)
+    cache.put_meta("key", stats, "stats")
+    assert cache.get_meta("key", "stats", RollupCube) is None
+
+    path = os.path.join(cache.cache_dir, f"key-stats.v{META_VERSION}.json")
+    with open(path) as f:
+        payload = json.load(f)
+    payload["version"] = META_VERSION + 1
+    with open(path, "w") as f:
+        json.dump(payload, f)
+    assert cache.get_meta("key", "stats", DatasetStats) is None
+
+
+def test_entries_are_not_pickles(cache, df):
+    with open(os.path.join(cache.cache_dir, f"key-stats.v{META_VERSION}.json"), "wb") as f:
+        f.write(b"\x80\x05N.") # pickle of None
+    assert cache.get_meta("key", "stats", DatasetStats) is None
+
+
+def test_oversized_file_is_kept_and_older_entries_evicted(tmp_path, df):
+    cache = DatasetCache(cache_dir=str(tmp_path), max_bytes=1_000)
+    cache.put("old", df.head(10))
+
+    def writer(path):
+        with open(path, "wb") as f:
+            f.write(b"x" * 5_000)
+
+    path = cache.put_file("key", writer, "cleaned", ".csv")
+    assert path is not None and os.path.getsize(path) == 5_000
+    assert cache.get("old") is None
+
+
+def test_mixed_type_columns_are_stored_as_text(cache, df):
+    df = df.head(6).copy()
+    df["Notes"] = pd.Series([1, "N/A", 2.5, None, np.nan, True], dtype=object)
+    cache.put("key", df, "sample")
+
+    loaded = cache.get("key", "sample")
+    assert loaded is not None
+    assert loaded["Notes"].tolist()[:3] == ["1", "N/A", "2.5"] and loaded["Notes"].iloc[3:5].isna().all()
+    columns = ["Region", "Product", "Sales", "Units_Sold"]
+    pd.testing.assert_frame_equal(loaded[columns], df[columns], check_column_type=False)
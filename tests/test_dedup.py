@@ -0,0 +1,45 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.dedup import MAX_PARTITION_BITS, _partition_bits, external_clean_csv
+
+
+@pytest.fixture
+def csv_bytes():
+    rng = np.random.default_rng(11)
+    n = 3_000
+    df = pd.DataFrame({
+        "Region": rng.choice(["North", "South", "East", None], n),
+        "Sales": rng.integers(1, 20, n).astype(str),
+        "Notes": [None] * n
+    })
+    df.iloc[::97] = None # a few empty rows
+    return df.to_csv(index=False).encode()
+
+
+@pytest.mark.parametrize("chunksize", [7, 500, 10_000])
+def test_matches_drop_duplicates(tmp_path, csv_bytes, chunksize):
+    output_path = tmp_path / "cleaned.csv"
+    report = external_clean_csv(io.BytesIO(csv_bytes), str(output_path), chunksize=chunksize, work_dir=str(tmp_path))
+
+    raw = pd.read_csv(io.BytesIO(csv_bytes), dtype=str)
+    expected = raw.dropna(how="all").dropna(how="all", axis=1).drop_duplicates()
+    cleaned = pd.read_csv(output_path, dtype=str)
+
+    key = list(expected.columns)
+    pd.testing.assert_frame_equal(cleaned.sort_values(key).reset_index(drop=True),
+                                  expected.sort_values(key).reset_index(drop=True))
+    assert report["rows"] == len(raw)
+    assert report["empty rows"] == len(raw) - len(raw.dropna(how="all"))
+    assert report["removed"] == len(raw.dropna(how="all")) - len(expected)
+    assert report["output rows"] == len(expected)
+    assert report["empty columns"] == ["Notes"]
+
+
+def test_partition_count_is_capped():
+    assert _partition_bits(None, 256) == 6
+    assert _partition_bits(1024**2, 256) == 1
+    assert _partition_bits(100 * 1024**4, 256) == MAX_PARTITION_BITS
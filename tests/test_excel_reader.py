@@ -0,0 +1,47 @@
+import io
+
+import pandas as pd
+import pytest
+
+openpyxl = pytest.importorskip("openpyxl")
+
+from src.excel_reader import excel_header, iter_excel_chunks, list_sheets, read_excel_streaming
+
+
+def workbook(rows, title="Data"):
+    book = openpyxl.Workbook()
+    sheet = book.active
+    sheet.title = title
+    for row in rows:
+        sheet.append(row)
+    buffer = io.BytesIO()
+    book.save(buffer)
+    buffer.seek(0)
+    return buffer
+
+
+def test_matches_read_excel():
+    rows = [["Region", "Sales", None, "Sales"]]
+    rows += [["North" if i % 3 else "South", i, i * 0.5 if i % 4 else None, i * 2] for i in range(500)]
+    rows.insert(100, [None, None, None, None])
+    buffer = workbook(rows)
+
+    # Fully blank rows are skipped (read_excel keeps them as NaN rows and turns int columns to float)
+    expected = pd.read_excel(workbook([row for row in rows if any(value is not None for value in row)]))
+    pd.testing.assert_frame_equal(read_excel_streaming(buffer, chunksize=64), expected)
+    assert excel_header(buffer) == expected.columns.tolist()
+
+
+def test_rows_wider_than_header_add_unnamed_columns():
+    rows = [["Region", "Sales"], ["North", 1], ["South", 2, "extra"], ["East", 3, None, "far"], ["West", 4]]
+    buffer = workbook(rows)
+
+    expected = pd.read_excel(buffer)
+    assert expected.columns.tolist() == ["Region", "Sales", "Unnamed: 2", "Unnamed: 3"]
+    pd.testing.assert_frame_equal(read_excel_streaming(buffer, chunksize=2), expected)
+
+
+def test_chunks_and_sheets():
+    buffer = workbook([["A"]] + [[i] for i in range(10)], title="Finance")
+    assert list_sheets(buffer) == ["Finance"]
+    assert [len(chunk) for chunk in iter_excel_chunks(buffer, "Finance", chunksize=4)] == [4, 4, 2]
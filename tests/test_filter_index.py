@@ -0,0 +1,36 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.filter_index import FilterIndex
+
+
+@pytest.fixture
+def df():
+    rng = np.random.default_rng(8)
+    n = 10_000
+    return pd.DataFrame({
+        "Region": rng.choice(["North", "South", "East", None], n),
+        "Product": pd.Categorical(rng.choice(["Laptop", "Mouse"], n), categories=["Laptop", "Mouse", "Tablet"]),
+        "Store": rng.integers(0, 50, n),
+        "Sales": rng.normal(100, 10, n)
+    }, index=np.arange(n) * 3)
+
+
+@pytest.mark.parametrize("column", ["Region", "Product", "Store"])
+def test_filter_matches_boolean_mask(df, column):
+    index = FilterIndex(df)
+    assert index.values(column) == df[column].dropna().unique().tolist()
+
+    for value in index.values(column):
+        expected = df[df[column] == value]
+        pd.testing.assert_frame_equal(index.filter(column, value), expected)
+        assert index.column(column).count(value) == len(expected)
+
+
+def test_unknown_and_missing_values(df):
+    index = FilterIndex(df)
+    assert index.filter("Region", "Nowhere").empty
+    assert index.column("Region").count(None) == 0
+    assert index.filter("Product", "Tablet").empty # unused category
+    assert sum(index.column("Region").count(value) for value in index.values("Region")) == df["Region"].notna().sum()
@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils import math_utils
+
+
+def test_robust_scale_falls_back_to_mean_absolute_deviation():
+    values = [5.0] * 90 + [5, 6, 100, 7, 8, 9, 10, 11, 12, 200]
+    df = pd.DataFrame({"mostly_equal": values, "constant": [3.0] * 100, "spread": np.arange(100.0)})
+    stats = math_utils.anomaly_column_stats(df, method="robust")
+
+    assert "constant" not in stats
+    center, scale = stats["mostly_equal"]
+    assert center == 5.0
+    assert scale == pytest.approx(1.253314 * np.mean(np.abs(np.array(values) - 5.0)))
+    assert stats["spread"] == (49.5, pytest.approx(25.0 * 1.4826))
+
+    hits = math_utils.scan_anomalies(df, top_k=10, method="robust")
+    assert [hit["value"] for hit in hits] == [200.0, 100.0]
+
+
+@pytest.fixture
+def sales():
+    rng = np.random.default_rng(21)
+    n = 3_000
+    df = pd.DataFrame({
+        "Sales": rng.normal(500, 50, n),
+        "Units_Sold": rng.integers(1, 100, n).astype(float),
+        "Region": rng.choice(["North", "South"], n)
+    }, index=np.arange(n) * 2)
+    df.loc[df.index[rng.random(n) < 0.05], "Sales"] = np.nan
+    df.iloc[[699, 700, 1_400, 2_999], 0] = 2_000.0 # equal extremes on both sides of chunk boundaries
+    return df
+
+
+def baseline_first_anomaly(df):
+    """find_first_anomaly as it was before the chunked scanner"""
+    numeric_df = df.select_dtypes(include=[np.number])
+    stats = numeric_df.describe()
+    z_scores = np.abs((numeric_df - stats.loc["mean"]) / stats.loc["std"].replace(0, 1))
+    outliers = (z_scores > 2.5).stack()
+    return outliers[outliers].index[0]
+
+
+@pytest.mark.parametrize("chunksize", [7, 700, 100_000])
+def test_zscore_scan_finds_the_baseline_first_anomaly(sales, chunksize):
+    expected = baseline_first_anomaly(sales)
+    assert math_utils.find_first_anomaly(sales) == expected
+
+    hits = list(math_utils.iter_anomalies(sales, method="zscore", threshold=2.5, chunksize=chunksize))
+    top = math_utils.scan_anomalies(sales, top_k=len(hits), method="zscore", threshold=2.5, chunksize=chunksize)
+    assert len(top) == len(hits)
+    columns = sales.columns.tolist()
+    first = min(top, key=lambda hit: (sales.index.get_loc(hit["row"]), columns.index(hit["column"])))
+    assert (first["row"], first["column"]) == expected
+
+
+def test_top_k_is_stable_across_chunk_boundaries(sales):
+    results = [math_utils.scan_anomalies(sales, top_k=10, method="robust", chunksize=chunksize)
+               for chunksize in (7, 700, 701, 1_400, 100_000)]
+    assert all(result == results[0] for result in results[1:])
+
+    assert [hit["row"] for hit in results[0][:4]] == [1_398, 1_400, 2_800, 5_998] # ties keep row order
+    scores = [abs(hit["score"]) for hit in results[0]]
+    assert scores == sorted(scores, reverse=True)
+
+
+@pytest.mark.filterwarnings("error")
+@pytest.mark.parametrize("dtype", [object, "str", "category"])
+def test_key_metrics_top_segment_from_text_columns(dtype):
+    df = pd.DataFrame({"Region": pd.Series(["North", "North", "South", "North"] * 5, dtype=dtype), "Sales": np.arange(20.0)})
+    assert math_utils.calculate_key_metrics(df)["top_column"] == "North"
@@ -0,0 +1,71 @@
+import pytest
+
+from utils import model_router
+from utils.model_router import ModelRouter
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(model_router.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_breaker_opens_half_opens_and_closes(clock):
+    router = ModelRouter(["a", "b"], failure_threshold=3, cooldown=30.0)
+
+    for _ in range(3):
+        assert router.allow("a")
+        router.record("a", error=RuntimeError("busy"))
+    assert router.snapshot()[0]["state"] == "open"
+    assert router.order() == ["b"]
+    assert not router.allow("a")
+
+    # Cooldown over: exactly one half-open probe goes through
+    clock[0] += 31
+    assert router.order() == ["a", "b"]
+    assert router.allow("a")
+    assert not router.allow("a")
+    assert router.order() == ["b"]
+
+    router.record("a", latency=0.5)
+    assert router.snapshot()[0]["state"] == "closed"
+    assert router.allow("a")
+
+
+def test_failed_probe_reopens(clock):
+    router = ModelRouter(["a"], failure_threshold=1, cooldown=10.0)
+    router.record("a", error="down")
+    clock[0] += 11
+    assert router.allow("a")
+    router.record("a", error="still down")
+    assert router.snapshot()[0]["state"] == "open"
+    assert not router.allow("a")
+
+
+def test_released_probe_can_be_retried(clock):
+    router = ModelRouter(["a"], failure_threshold=1, cooldown=10.0)
+    router.record("a", error="down")
+    clock[0] += 11
+    assert router.allow("a")
+    router.release("a")
+    assert router.allow("a")
+
+
+def test_error_rate_opens_breaker(clock):
+    router = ModelRouter(["a"], failure_threshold=100, max_error_rate=0.5, min_samples=2)
+    for i in range(4):
+        router.record("a", error="flaky") if i % 2 else router.record("a", latency=0.1)
+    assert router.snapshot()[0]["state"] == "open"
+
+
+def test_orders_by_latency_and_keeps_first_token_separate(clock):
+    router = ModelRouter(["slow", "fast", "new"], min_samples=2)
+    for _ in range(2):
+        router.record("slow", latency=5.0)
+        router.record("fast", latency=1.0)
+        router.record("slow", latency=0.1, first_token=True)
+    assert router.order() == ["fast", "slow", "new"]
+    assert router.p50("slow") == 5.0
+    assert router.p50("slow", first_token=True) == 0.1
+    assert router.p50("new") is None
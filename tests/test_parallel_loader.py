@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.parallel_loader import parallel_read_csv, split_ranges
+
+
+def write(tmp_path, text):
+    path = tmp_path / "data.csv"
+    path.write_text(text)
+    return str(path)
+
+
+def check(path, **kwargs):
+    expected = pd.read_csv(path)
+    result = parallel_read_csv(path, workers=2, min_bytes=0, sample_rows=50, **kwargs)
+    pd.testing.assert_frame_equal(result, expected)
+
+
+def test_matches_read_csv(tmp_path):
+    rng = np.random.default_rng(0)
+    n = 5_000
+    df = pd.DataFrame({
+        "Region": rng.choice(["North", "South"], n),
+        "Units": rng.integers(1, 100, n),
+        "Price": rng.integers(1, 100, n).astype(float)
+    })
+    df.loc[4_000, "Units"] = np.nan #an integer column with a gap late in the file
+    path = str(tmp_path / "data.csv")
+    df.to_csv(path, index=False)
+    check(path)
+
+
+def test_column_turning_to_text_after_the_sample(tmp_path):
+    rows = [f"{i},{i % 7}" for i in range(4_000)] + [f"{i},code-{i}" for i in range(4_000, 4_100)]
+    check(write(tmp_path, "id,value\n" + "\n".join(rows) + "\n"))
+
+
+def test_text_column_that_looks_numeric_in_some_ranges(tmp_path):
+    rows = [f"{i},{'abc' if i < 10 else i}" for i in range(4_000)]
+    check(write(tmp_path, "id,label\n" + "\n".join(rows) + "\n"))
+
+
+def test_quoted_newline_beyond_the_first_megabyte(tmp_path):
+    filler = "\n".join(f"{i},plain text row {i:010d}" for i in range(60_000))
+    quoted = "\n".join(f'{i},"line one\nline two"' for i in range(60_000, 120_000))
+    text = "id,note\n" + filler + "\n" + quoted + "\n"
+    path = write(tmp_path, text)
+    assert len(text) > 1024**2
+    check(path)
+
+
+def test_ranges_cover_the_file_at_line_starts(tmp_path):
+    path = write(tmp_path, "a\n" + "\n".join(str(i) for i in range(1_000)) + "\n")
+    ranges = split_ranges(path, 2, 7)
+    data = open(path, "rb").read()
+    assert ranges[0][0] == 2 and ranges[-1][1] == len(data)
+    assert all(data[start - 1:start] == b"\n" for start, _ in ranges)
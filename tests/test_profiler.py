@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.profiler import profile_frame
+
+
+@pytest.fixture
+def df():
+    rng = np.random.default_rng(11)
+    n = 5_000
+    df = pd.DataFrame({
+        "Sales": rng.normal(1_000, 250, n),
+        "Units_Sold": rng.integers(1, 100, n),
+        "Discount": pd.array(rng.integers(0, 30, n), dtype="Int64"),
+        "Region": rng.choice(["North", "South", "East", None], n),
+        "Product": pd.Categorical(rng.choice(["Laptop", "Mouse"], n)),
+        "Date": pd.date_range("2024-01-01", periods=n, freq="h"),
+        "Flag": rng.random(n) < 0.5
+    })
+    df.loc[rng.random(n) < 0.1, "Sales"] = np.nan
+    df.loc[rng.random(n) < 0.05, "Discount"] = pd.NA
+    return pd.concat([df, df.iloc[:40]], ignore_index=True)
+
+
+def test_matches_describe_median_and_isna(df):
+    profile = profile_frame(df, column_batch=2)
+
+    numeric = df.select_dtypes(include=[np.number])
+    assert profile["numeric_cols"] == numeric.columns.tolist()
+    assert profile["missing"] == df.isna().sum().to_dict()
+    assert profile["duplicate_rows"] == int(df.duplicated().sum()) == 40
+
+    desc = numeric.describe()
+    medians = numeric.median()
+    for column in numeric.columns:
+        stats = profile["numeric"][column]
+        assert stats["count"] == desc.loc["count", column]
+        assert stats["median"] == pytest.approx(medians[column])
+        for key, row in [("mean", "mean"), ("std", "std"), ("min", "min"), ("max", "max"), ("q1", "25%"), ("q3", "75%")]:
+            assert stats[key] == pytest.approx(desc.loc[row, column]), (column, key)
+
+
+def test_empty_numeric_column():
+    df = pd.DataFrame({"a": [np.nan, np.nan], "b": ["x", "x"]})
+    stats = profile_frame(df)["numeric"]["a"]
+    assert stats["count"] == 0 and stats["missing"] == 2
+    assert np.isnan(stats["median"])
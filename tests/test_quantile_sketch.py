@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.quantile_sketch import KLLSketch
+
+QS = [0.01, 0.1, 0.25, 0.5, 0.75, 0.9, 0.99]
+
+
+@pytest.fixture
+def values():
+    return np.random.default_rng(13).lognormal(mean=3, sigma=1, size=200_000)
+
+
+def rank_error(values, estimates):
+    ordered = np.sort(values)
+    ranks = np.searchsorted(ordered, estimates, side="right") / ordered.size
+    return np.abs(ranks - np.array(QS))
+
+
+def test_quantiles_within_rank_error(values):
+    sketch = KLLSketch.from_values(values, k=200)
+    assert sketch.count == values.size
+    assert sketch.quantiles([0, 1]) == [values.min(), values.max()]
+    assert rank_error(values, sketch.quantiles(QS)).max() < 3 * sketch.error
+
+
+def test_merged_chunks_within_rank_error(values):
+    parts = [KLLSketch.from_values(chunk) for chunk in np.array_split(values, 7)]
+    merged = parts[0]
+    for part in parts[1:]:
+        merged = merged.merge(part)
+    assert merged.count == values.size
+    assert rank_error(values, merged.quantiles(QS)).max() < 3 * merged.error
+
+
+def test_same_values_give_same_sketch(values):
+    first, second = KLLSketch.from_values(values), KLLSketch.from_values(values)
+    assert first.quantiles(QS) == second.quantiles(QS)
+    assert first.iqr_outliers() == second.iqr_outliers()
+    np.testing.assert_array_equal(first.histogram(20)[0], second.histogram(20)[0])
+
+
+def test_small_input_is_exact():
+    values = np.array([5.0, 1.0, np.nan, 3.0, 2.0, 4.0])
+    sketch = KLLSketch.from_values(values)
+    assert sketch.count == 5
+    assert sketch.quantiles([0.5]) == [pd.Series(values).quantile(0.5, interpolation="lower")]
+    counts, edges = sketch.histogram(4)
+    np.testing.assert_array_equal(counts, np.histogram(values[~np.isnan(values)], bins=edges)[0])
+
+
+def test_iqr_outliers_close_to_exact(values):
+    sketch = KLLSketch.from_values(values, k=400)
+    outside, low, high = sketch.iqr_outliers()
+    exact = int(((values < low) | (values > high)).sum())
+    assert abs(outside - exact) <= 3 * sketch.error * values.size
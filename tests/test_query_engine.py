@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.query_engine import QueryEngine
+from src.rollup import RollupCube
+from src.filter_index import FilterIndex
+from src.running_stats import DatasetStats
+
+
+@pytest.fixture
+def df():
+    rng = np.random.default_rng(3)
+    n = 20_000
+    return pd.DataFrame({
+        "Region": rng.choice(["North", "South", "East"], n),
+        "Product": rng.choice(["Laptop", "Mouse"], n),
+        "Sales": rng.integers(1, 500, n).astype(float),
+        "Units_Sold": rng.integers(1, 10, n)
+    })
+
+
+QUESTIONS = ["total sales by region", "average sales for laptop", "count of rows by product",
+             "how many rows in north", "how many regions", "top 2 region by average sales",
+             "total units sold", "average sales", "how many records"]
+
+
+@pytest.mark.parametrize("question", QUESTIONS)
+def test_aggregates_match_pandas(df, question):
+    plain = QueryEngine(df).answer(question)
+    fast = QueryEngine(df, rollup=RollupCube.from_frame(df), filter_index=FilterIndex(df),
+                       stats=DatasetStats.from_frame(df)).answer(question)
+
+    if isinstance(plain["result"], pd.Series):
+        pd.testing.assert_series_equal(plain["result"].sort_index(), fast["result"].sort_index(),
+                                       check_names=False, check_dtype=False)
+    else:
+        assert plain["result"] == pytest.approx(fast["result"])
+
+
+def test_groupby_reference(df):
+    result = QueryEngine(df).answer("total sales by region")["result"]
+    pd.testing.assert_series_equal(result.sort_index(), df.groupby("Region")["Sales"].sum(), check_names=False)
+
+
+def test_sample_answers_use_full_aggregates_or_say_so(df):
+    sample = df.sample(1_000, random_state=0)
+    engine = QueryEngine(sample, rollup=RollupCube.from_frame(df), stats=DatasetStats.from_frame(df), sample_of=len(df))
+
+    total = engine.answer("total sales by region")
+    assert not total["sampled"]
+    pd.testing.assert_series_equal(total["result"].sort_index(), df.groupby("Region")["Sales"].sum(), check_names=False)
+    assert engine.answer("how many records")["result"] == len(df)
+
+    median = engine.answer("median sales by region")
+    assert median["sampled"] and "working sample" in median["answer"]
+
+
+def test_open_ended_question_is_not_answered(df):
+    assert QueryEngine(df).answer("Which region should we expand into?") is None
@@ -0,0 +1,71 @@
+import pytest
+
+from utils import response_cache
+from utils.response_cache import ResponseCache
+
+PARAMS = {"max_tokens": 150, "temperature": 0.7}
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1_000_000.0]
+    monkeypatch.setattr(response_cache.time, "time", lambda: now[0])
+    return now
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ResponseCache(path=str(tmp_path / "responses.sqlite3"), ttl=60, max_entries=3, flush_every=2)
+
+
+def test_hit_ignores_whitespace_and_respects_params(cache, clock):
+    cache.put("a", "Summarise   the\nstats", PARAMS, "answer")
+    assert cache.get(["a"], "Summarise the stats", PARAMS) == "answer"
+    assert cache.get(["a"], "Summarise the stats", {**PARAMS, "temperature": 0.1}) is None
+    assert cache.get(["b"], "Summarise the stats", PARAMS) is None
+
+
+def test_entries_expire_after_ttl(cache, clock):
+    cache.put("a", "p", PARAMS, "answer")
+    clock[0] += 59
+    assert cache.get(["a"], "p", PARAMS) == "answer"
+    clock[0] += 2
+    assert cache.get(["a"], "p", PARAMS) is None
+
+    cache.put("a", "q", PARAMS, "fresh") # writes also purge expired rows
+    assert cache.stats()["entries"] == 1
+
+
+def test_least_recently_used_is_evicted(cache, clock):
+    for i, prompt in enumerate(["p0", "p1", "p2"]):
+        clock[0] += 1
+        cache.put("a", prompt, PARAMS, f"answer {i}")
+
+    clock[0] += 1
+    assert cache.get(["a"], "p0", PARAMS) == "answer 0" # p1 is now the least recently used
+    clock[0] += 1
+    cache.put("a", "p3", PARAMS, "answer 3")
+
+    assert cache.get(["a"], "p1", PARAMS) is None
+    assert cache.get(["a"], "p0", PARAMS) == "answer 0"
+    assert cache.get(["a"], "p2", PARAMS) == "answer 2"
+    assert cache.stats()["entries"] == 3
+
+
+def test_answer_ranked_by_tier_order(cache, clock):
+    cache.put("primary", "p", PARAMS, "from primary")
+    clock[0] += 1
+    cache.put("backup", "p", PARAMS, "from backup") # newer, but from a lower tier
+    assert cache.get(["primary", "backup"], "p", PARAMS) == "from primary"
+    assert cache.get(["backup", "primary"], "p", PARAMS) == "from backup"
+
+
+def test_counters_are_buffered_then_flushed(cache, clock):
+    cache.put("a", "p", PARAMS, "answer")
+    cache.get(["a"], "p", PARAMS)
+    cache.get(["a"], "missing", PARAMS)
+    cache.get(["a"], "p", PARAMS)
+
+    other = ResponseCache(path=cache.path) # another worker sees what has been flushed
+    assert other.stats()["hits"] + other.stats()["misses"] == 2
+    assert cache.stats() == {"hits": 2, "misses": 1, "hit_rate": pytest.approx(2 / 3), "entries": 1}
@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.rollup import RollupCube
+from utils import math_utils
+
+
+@pytest.fixture
+def df():
+    rng = np.random.default_rng(17)
+    n = 12_000
+    return pd.DataFrame({
+        "Region": rng.choice(["North", "South", "East", "West"], n),
+        "Product": rng.choice(["Laptop", "Mouse", "Keyboard"], n),
+        "Order_ID": np.arange(n).astype(str),
+        "Sales": np.where(rng.random(n) < 0.1, np.nan, rng.integers(100, 5000, n)),
+        "Units_Sold": rng.integers(1, 100, n)
+    })
+
+
+@pytest.fixture
+def cube(df):
+    cube = RollupCube(max_categories=100)
+    for start in range(0, len(df), 2_500):
+        cube.update(df.iloc[start:start + 2_500])
+    return cube
+
+
+def test_matches_groupby(df, cube):
+    assert cube.excluded == {"Order_ID"}
+    assert cube.measures == ["Sales", "Units_Sold"]
+
+    groups = df.groupby("Region")
+    pd.testing.assert_series_equal(cube.rows["Region"].sort_index(), groups.size(), check_names=False)
+    pd.testing.assert_frame_equal(cube.sums["Region"].sort_index(), groups[cube.measures].sum(), check_dtype=False)
+    pd.testing.assert_frame_equal(cube.counts["Region"].sort_index(), groups[cube.measures].count(), check_dtype=False)
+
+    north = df[df["Region"] == "North"]
+    pd.testing.assert_series_equal(cube.value_counts("Product", "Region", "North"),
+                                   north["Product"].value_counts(), check_names=False, check_index_type=False)
+
+
+@pytest.mark.parametrize("value", ["North", "South", "East", "West"])
+def test_key_metrics_match_math_utils(df, cube, value):
+    rows = df[df["Region"] == value]
+    expected = math_utils.calculate_key_metrics(rows, category_cols=["Product"])
+    assert cube.key_metrics("Region", value, "Product") == pytest.approx(expected)
+
+
+def test_merge_drops_dimensions_that_become_ids(df):
+    left = RollupCube.from_frame(df.iloc[:100], max_categories=150)
+    right = RollupCube.from_frame(df.iloc[100:200], max_categories=150)
+    merged = left.merge(right)
+    assert "Order_ID" in merged.excluded
+    assert "Region" in merged.rows
+
+
+def test_merge_with_all_missing_columns_in_a_batch(df):
+    batch = df.iloc[6_000:9_000].copy()
+    batch["Sales"] = pd.Series([None] * len(batch), index=batch.index, dtype=object) # an all-None Excel batch
+    batch["Product"] = np.nan
+    whole = pd.concat([df.iloc[:6_000], batch, df.iloc[9_000:]])
+
+    cube = RollupCube(max_categories=100)
+    for part in (df.iloc[:6_000], batch, df.iloc[9_000:]):
+        cube.update(part)
+
+    assert cube.measures == ["Sales", "Units_Sold"]
+    assert "Product" in cube.rows and "Product" not in cube.excluded
+
+    expected = whole.astype({"Sales": float})
+    for dimension in ("Region", "Product"):
+        groups = expected.groupby(dimension)
+        pd.testing.assert_series_equal(cube.rows[dimension].sort_index(), groups.size(), check_names=False)
+        pd.testing.assert_frame_equal(cube.sums[dimension].sort_index(), groups[cube.measures].sum(), check_dtype=False)
+        pd.testing.assert_frame_equal(cube.counts[dimension].sort_index(), groups[cube.measures].count(), check_dtype=False)
+
+    north = expected[expected["Region"] == "North"]
+    pd.testing.assert_series_equal(cube.value_counts("Product", "Region", "North"),
+                                   north["Product"].value_counts(), check_names=False, check_index_type=False)
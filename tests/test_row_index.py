@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data_processor import DataProcessor
+from src.row_index import RowHashIndex
+
+
+def frames():
+    rng = np.random.default_rng(7)
+    n = 2_000
+    base = pd.DataFrame({
+        "Region": rng.choice(["North", "South", None], n),
+        "Units": rng.integers(0, 5, n),
+        "Price": rng.choice([0.0, -0.0, 1.5, np.nan, -np.nan], n)
+    })
+    yield base
+    yield base.astype({"Price": "Float64"})
+    yield pd.DataFrame({"mixed": [1, 1.0, "1", True, None, np.nan, 1, "1"], "k": [0] * 8})
+    yield pd.DataFrame({"a": [-0.0, 0.0, 0.0], "b": ["x", "x", "x"]})
+    yield pd.DataFrame({"a": [1, 1], "a2": [2, 2]}).set_axis(["a", "a"], axis=1)
+
+
+@pytest.mark.parametrize("df", list(frames()))
+def test_clean_data_matches_drop_duplicates(df):
+    processor = DataProcessor(workers=1)
+    processor.data = df.copy()
+    cleaned = processor.clean_data()
+
+    expected = df.dropna(how="all").dropna(axis=1, how="all").drop_duplicates().reset_index(drop=True)
+    pd.testing.assert_frame_equal(cleaned, expected)
+
+
+@pytest.mark.parametrize("df", list(frames()))
+def test_duplicate_count_matches_duplicated(df):
+    index = RowHashIndex.from_frame(df)
+    if index.exact:
+        assert index.duplicate_count() == int(df.duplicated().sum())
+
+
+def test_in_place_edit_is_seen():
+    processor = DataProcessor(workers=1)
+    processor.data = pd.DataFrame({"a": [1, 2, 3], "b": ["x", "y", "z"]})
+    assert processor.get_info()["duplicate rows"] == 0
+
+    processor.data.loc[1] = [1, "x"]
+    assert processor.get_info()["duplicate rows"] == 1
+    assert len(processor.clean_data()) == 2
+
+
+def test_first_occurrences_match_duplicated():
+    df = pd.DataFrame({"a": np.random.default_rng(1).integers(0, 20, 5_000)})
+    index = RowHashIndex.from_frame(df)
+    np.testing.assert_array_equal(index.duplicated(), df.duplicated().to_numpy())
+
+
+def test_diff_by_value():
+    previous = pd.DataFrame({"a": [1, 2, 3]})
+    current = pd.DataFrame({"a": [2, 3, 4, 5]})
+    changes = RowHashIndex.from_frame(current).diff(RowHashIndex.from_frame(previous))
+    assert changes["added"].tolist() == [2, 3]
+    assert changes["removed"].tolist() == [0]
@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data_processor import DataProcessor
+from src.running_stats import DatasetStats
+
+
+@pytest.fixture
+def df():
+    rng = np.random.default_rng(21)
+    n = 4_000
+    df = pd.DataFrame({
+        "Region": rng.choice(["North", "South", "East", None], n),
+        "Sales": rng.normal(100, 25, n).round(2),
+        "Units": rng.integers(1, 20, n).astype(float),
+        "Discount": np.where(rng.random(n) < 0.5, np.nan, rng.random(n))
+    })
+    df.iloc[::40] = np.nan # empty rows
+    df.iloc[1::40] = df.iloc[2::40].to_numpy() # duplicates
+    df.loc[df.index[1::40], "Discount"] = np.nan
+    df.loc[df.index[2::40], "Discount"] = np.nan
+    return df
+
+
+def assert_same(stats, df):
+    assert stats.rows == len(df)
+    assert stats.missing == df.isna().sum().to_dict()
+    for column in ["Sales", "Units", "Discount"]:
+        summary = stats.numeric[column].to_dict()
+        values = df[column]
+        assert summary["count"] == values.count()
+        assert summary["missing"] == values.isna().sum()
+        assert summary["sum"] == pytest.approx(values.sum())
+        assert summary["mean"] == pytest.approx(values.mean())
+        assert summary["std"] == pytest.approx(values.std())
+        assert summary["min"] == values.min() and summary["max"] == values.max()
+    assert stats.categories["Region"] == df["Region"].value_counts().to_dict()
+    assert stats.distinct_count("Region") == df["Region"].nunique()
+
+
+def test_merged_chunks_match_pandas(df):
+    assert_same(DatasetStats.from_frame(df, chunksize=333), df)
+    assert_same(DatasetStats.from_frame(df), df)
+
+
+def test_subtract_matches_fresh_stats(df):
+    stats = DatasetStats.from_frame(df)
+    processor = DataProcessor()
+    processor.data = df
+    cleaned = processor.clean_data()
+
+    removed = df.iloc[processor.removed_positions]
+    assert not removed.isna().all(axis=None) # duplicates as well as empty rows
+    result = stats.subtract(DatasetStats.from_frame(removed)).select(cleaned.columns)
+    fresh = DatasetStats.from_frame(cleaned)
+
+    assert_same(result, cleaned)
+    assert result.missing == fresh.missing
+    for column in fresh.numeric:
+        assert result.numeric[column].missing == fresh.numeric[column].missing
+        assert result.numeric[column].count == fresh.numeric[column].count
+
+
+def test_subtract_rows_empty_in_one_column(df):
+    stats = DatasetStats.from_frame(df)
+    removed = df[df["Discount"].isna()].iloc[:50]
+    assert removed["Discount"].isna().all()
+
+    result = stats.subtract(DatasetStats.from_frame(removed))
+    assert result.numeric["Discount"].missing == df["Discount"].isna().sum() - 50
+    assert result.numeric["Discount"].mean == stats.numeric["Discount"].mean
+    assert "Discount" in result.sketches # nothing with a value was removed from it
@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.sampling import ReservoirSampler, StratifiedReservoirSampler
+
+
+@pytest.fixture
+def df():
+    rng = np.random.default_rng(1)
+    n = 5_000
+    return pd.DataFrame({
+        "Region": rng.choice(["North", "South", "East", None], n, p=[0.6, 0.25, 0.1, 0.05]),
+        "Sales": np.arange(n, dtype=float)
+    })
+
+
+def stream(sampler, df, chunksize):
+    for start in range(0, len(df), chunksize):
+        sampler.update(df.iloc[start:start + chunksize])
+    return sampler.get_sample()
+
+
+@pytest.mark.parametrize("chunksize", [7, 333, 10_000])
+def test_sample_is_a_subset_in_stream_order(df, chunksize):
+    sample = stream(ReservoirSampler(size=500), df, chunksize)
+    assert len(sample) == 500
+    assert sample["Sales"].is_monotonic_increasing
+    pd.testing.assert_frame_equal(sample, df.iloc[sample["Sales"].astype(int)].reset_index(drop=True))
+
+
+def test_small_stream_is_kept_whole(df):
+    head = df.iloc[:120]
+    pd.testing.assert_frame_equal(stream(ReservoirSampler(size=500), head, 50), head)
+
+
+def test_inclusion_is_uniform():
+    n, size, runs = 100, 20, 500
+    df = pd.DataFrame({"row": np.arange(n)})
+    hits = np.zeros(n)
+    for seed in range(runs):
+        hits[stream(ReservoirSampler(size=size, random_state=seed), df, 37)["row"]] += 1
+
+    expected = runs * size / n
+    assert np.abs(hits - expected).max() < 5 * np.sqrt(expected) # binomial spread
+    assert abs(hits[: n // 2].sum() - hits[n // 2:].sum()) < 0.05 * hits.sum() # no bias towards early or late rows
+
+
+def test_same_seed_same_sample(df):
+    first = stream(ReservoirSampler(size=300, random_state=7), df, 400)
+    second = stream(ReservoirSampler(size=300, random_state=7), df, 400)
+    pd.testing.assert_frame_equal(first, second)
+
+
+def test_stratified_shares_match_value_counts(df):
+    sample = stream(StratifiedReservoirSampler("Region", size=1_000), df, 700)
+    assert len(sample) == 1_000
+    assert sample["Sales"].is_monotonic_increasing
+
+    expected = df["Region"].value_counts(dropna=False, normalize=True) * 1_000
+    counts = sample["Region"].value_counts(dropna=False)
+    assert (np.abs(counts.reindex(expected.index) - expected) < 1).all() # largest-remainder rounding
+
+
+def test_stratified_rejects_id_columns(df):
+    sampler = StratifiedReservoirSampler("Sales", size=100, max_strata=50)
+    with pytest.raises(ValueError):
+        sampler.update(df)
@@ -1,9 +1,39 @@
 import os
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from huggingface_hub import InferenceClient
 from dotenv import load_dotenv
 
+try:
+    from utils.model_router import ModelRouter
+    from utils.response_cache import ResponseCache
+except ImportError:
+    from model_router import ModelRouter
+    from response_cache import ResponseCache
+
+try:
+    from huggingface_hub import configure_http_backend #huggingface_hub < 1.0 (requests backend)
+    import requests
+except ImportError:
+    configure_http_backend = None #huggingface_hub >= 1.0 already shares one keep-alive httpx client
+
 load_dotenv()
 HF_TOKEN = os.getenv("HF_API_TOKEN")
+REQUEST_TIMEOUT = float(os.getenv("HF_REQUEST_TIMEOUT", "20")) #seconds per request before falling back
+POOL_SIZE = int(os.getenv("HF_POOL_SIZE", "16")) #keep-alive connections per host
+HEDGE = os.getenv("HF_HEDGE", "1") != "0" #race the fallback tiers instead of trying them one by one
+HEDGE_DELAY = os.getenv("HF_HEDGE_DELAY") #fixed hedge delay in seconds; unset = the tier's recent p50 latency
+DEFAULT_HEDGE_DELAY = 2.0 #used until a tier has enough latency samples
+BREAKER_COOLDOWN = float(os.getenv("HF_BREAKER_COOLDOWN", "30")) #seconds a failing model is skipped before a probe
+CACHE_TTL = float(os.getenv("HF_CACHE_TTL", str(24 * 3600))) #seconds an answer is reused; 0 disables the disk cache
+CACHE_SIZE = int(os.getenv("HF_CACHE_SIZE", "5000")) #answers kept before least-recently-used eviction
+
+# 3. Speed Parameters (also part of the response cache key)
+GENERATION_PARAMS = {
+    "max_tokens": 150,   # Hard limit to stop long ramblings
+    "temperature": 0.7   # Slight creativity
+}
 
 # --- SPEED OPTIMIZATION STRATEGY ---
 # usin "Tiered Fallback":
@@ -16,11 +46,39 @@ MODELS = [
     "meta-llama/Meta-Llama-3-8B-Instruct" # 🛡️ STABLE BACKUP
 ]
 
-def get_llm_response(prompt_text):
+# --- CONNECTION REUSE ---
+# One long-lived client per model for the whole process (shared by every Streamlit session and thread),
+# so a call only pays for the request itself, not client construction + a fresh TCP/TLS handshake.
+_CLIENTS = {}
+_CLIENTS_LOCK = threading.Lock()
+
+def _http_session():
+    """Keep-alive session with a pool sized for concurrent Streamlit sessions (huggingface_hub caches one per thread)"""
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=len(MODELS), pool_maxsize=POOL_SIZE)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+if configure_http_backend is not None:
+    configure_http_backend(backend_factory=_http_session)
+
+def get_client(model_id):
     """
-    Tries multiple models until one succeeds.
-    Optimized for HACKATHON SPEED (<3 seconds).
+    Pooled InferenceClient for a model (or endpoint URL), created on first use.
     """
+    client = _CLIENTS.get(model_id)
+    if client is None:
+        with _CLIENTS_LOCK:
+            client = _CLIENTS.get(model_id) # another thread may have won the race
+            if client is None:
+                client = _CLIENTS[model_id] = InferenceClient(model=model_id, token=HF_TOKEN, timeout=REQUEST_TIMEOUT)
+    return client
+
+FALLBACK_MESSAGE = "⚠️ AI Traffic High. Please try again in 5 seconds."
+INTERRUPTED_SUFFIX = " …(response interrupted)"
+
+def _build_messages(prompt_text):
     # 1. Strict "Speed" Instructions
     # We tell the AI to be brief. Generating 20 words takes 0.5s. Generating 100 takes 5s.
     system_instruction = (
@@ -31,32 +89,237 @@ def get_llm_response(prompt_text):
     "Do not suggest unethical actions (e.g., layoffs, discrimination). Focus on growth and efficiency."
 )
     
-    messages = [
+    return [
         {"role": "user", "content": f"{system_instruction}\n\nTask: {prompt_text}"}
     ]
 
-    # 2. Loop through fast models
-    for model_id in MODELS:
+def get_llm_response(prompt_text, hedge=None):
+    """
+    Tries multiple models until one succeeds.
+    Optimized for HACKATHON SPEED (<3 seconds).
+    With hedging on (default), a slow tier no longer holds up the next one: see _hedged.
+    """
+    messages = _build_messages(prompt_text)
+    cached = _cached(messages)
+    if cached is not None:
+        return cached
+
+    use_hedge = HEDGE if hedge is None else hedge
+    if use_hedge:
+        content = _hedged(messages)
+    else:
+        content = _sequential(messages)
+
+    # 4. Ultimate Fallback (If all APIs are down)
+    return content if content is not None else FALLBACK_MESSAGE
+
+def stream_llm_response(prompt_text, hedge=None):
+    """
+    Same tiers as get_llm_response, but yields the answer as text deltas while it is generated,
+    so the page can show the first words instead of a loader.
+    With hedging on (default) the tiers race to their first token, like _hedged races to a whole
+    answer: the first stream to produce text is shown and the others are closed. A model that fails
+    before its first token is skipped for the next one; once text has been shown we stay on that
+    model. Yields FALLBACK_MESSAGE if no model answers.
+    """
+    messages = _build_messages(prompt_text)
+    cached = _cached(messages)
+    if cached is not None:
+        yield cached
+        return
+
+    use_hedge = HEDGE if hedge is None else hedge
+    pending = {}
+    tiers = iter(ROUTER.order())
+    latest = None
+    winner = None
+
+    def launch():
+        nonlocal latest
+        latest = next((model_id for model_id in tiers if ROUTER.allow(model_id)), None)
+        if latest is not None:
+            print(f"⚡ Streaming from: {latest}...")
+            pending[_EXECUTOR.submit(_open_stream, latest, messages)] = latest
+        return latest is not None
+
+    try:
+        more = launch()
+        while pending and winner is None:
+            timeout = hedge_delay(latest, first_token=True) if more and use_hedge else None
+            done, _ = wait(list(pending), timeout=timeout, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                model_id = pending.pop(future)
+                try:
+                    winner = (model_id, *future.result())
+                    break
+                except Exception as e:
+                    print(f"⚠️ {model_id} failed/busy: {e}")
+
+            # Timed out (hedge) or every finished stream failed (fallback): bring in the next tier
+            if winner is None and more:
+                more = launch()
+    finally:
+        # Losers: drop queued ones, close the streams of running ones once they open
+        for future, model_id in pending.items():
+            if future.cancel():
+                ROUTER.release(model_id)
+            else:
+                future.add_done_callback(_close_stream)
+
+    if winner is None:
+        yield FALLBACK_MESSAGE
+        return
+
+    model_id, stream, first = winner
+    parts = [first]
+    yield first
+    try:
+        for chunk in stream:
+            delta = chunk.choices[0].delta.content if chunk.choices else None
+            if delta:
+                parts.append(delta)
+                yield delta
+    except GeneratorExit: # the page stopped reading: the model already answered
+        if hasattr(stream, "close"):
+            stream.close()
+        raise
+    except Exception as e:
+        ROUTER.record(model_id, error=e)
+        print(f"⚠️ {model_id} failed/busy: {e}")
+        yield INTERRUPTED_SUFFIX
+        return
+
+    _store(model_id, messages, "".join(parts))
+
+def _open_stream(model_id, messages):
+    """
+    Open a streamed completion and read it up to its first text delta; reports the time to first
+    token (or the error) to ROUTER. Returns the open stream and that first delta.
+    """
+    start = time.perf_counter()
+    stream = None
+    try:
+        stream = iter(get_client(model_id).chat_completion(messages, stream=True, **GENERATION_PARAMS))
+        for chunk in stream:
+            delta = chunk.choices[0].delta.content if chunk.choices else None
+            if delta:
+                ROUTER.record(model_id, latency=time.perf_counter() - start, first_token=True)
+                return stream, delta
+        raise RuntimeError("empty response")
+    except Exception as e:
+        if stream is not None and hasattr(stream, "close"):
+            stream.close()
+        ROUTER.record(model_id, error=e)
+        raise
+
+def _close_stream(future):
+    """Done-callback for a losing hedged stream: close it so its connection goes back to the pool"""
+    if not future.cancelled() and future.exception() is None:
+        stream, _ = future.result()
+        if hasattr(stream, "close"):
+            stream.close()
+
+def _sequential(messages):
+    """
+    Original tiered fallback: each model in turn, next one only after a failure.
+    """
+    # 2. Loop through fast models (fastest healthy first, see ROUTER)
+    for model_id in ROUTER.order():
+        if not ROUTER.allow(model_id):
+            continue
         try:
             print(f"⚡ Attempting fast inference with: {model_id}...") # Keep this for your own sanity
-            
-            client = InferenceClient(model=model_id, token=HF_TOKEN)
-            
-            # 3. Speed Parameters
-            response = client.chat_completion(
-                messages, 
-                max_tokens=150,   # Hard limit to stop long ramblings
-                temperature=0.7,  # Slight creativity
-                stream=False      # No streaming = simpler handling
-            )
-            
-            # Success! Return immediately.
-            return response.choices[0].message.content
-            
+            content = _complete(model_id, messages)
+            _store(model_id, messages, content)
+            return content # Success! Return immediately.
         except Exception as e:
             # If this model fails, print error and immediately try the next one
             print(f"⚠️ {model_id} failed/busy: {e}")
-            continue 
-            
-    # 4. Ultimate Fallback (If all APIs are down)
-    return "⚠️ AI Traffic High. Please try again in 5 seconds."
\ No newline at end of file
+    return None
+
+def _hedged(messages):
+    """
+    Hedged fallback: send to the first tier in ROUTER order, and if it has not answered within its usual (p50) latency,
+    also send to the next tier. A failure launches the next tier at once. First success wins;
+    the others are cancelled if still queued, or abandoned (bounded by REQUEST_TIMEOUT) if running.
+    """
+    pending = {}
+    tiers = iter(ROUTER.order())
+    latest = None
+
+    def launch():
+        nonlocal latest
+        latest = next((model_id for model_id in tiers if ROUTER.allow(model_id)), None)
+        if latest is not None:
+            print(f"⚡ Attempting fast inference with: {latest}...")
+            pending[_EXECUTOR.submit(_complete, latest, messages)] = latest
+        return latest is not None
+
+    more = launch()
+    while pending:
+        done, _ = wait(list(pending), timeout=hedge_delay(latest) if more else None, return_when=FIRST_COMPLETED)
+
+        for future in done:
+            model_id = pending.pop(future)
+            try:
+                content = future.result()
+            except Exception as e:
+                print(f"⚠️ {model_id} failed/busy: {e}")
+                continue
+
+            for other, other_id in pending.items():
+                if other.cancel():
+                    ROUTER.release(other_id)
+            _store(model_id, messages, content) # only the answer shown is cached, not late losing ones
+            return content
+
+        # Timed out (hedge) or every finished request failed (fallback): bring in the next tier
+        if more:
+            more = launch()
+            if not more and not pending:
+                break
+    return None
+
+# --- ADAPTIVE ROUTING (tier order, circuit breakers and the hedge delay) ---
+# ROUTER.snapshot() shows each model's state and why it is being skipped.
+_EXECUTOR = ThreadPoolExecutor(max_workers=POOL_SIZE, thread_name_prefix="llm")
+ROUTER = ModelRouter(MODELS, cooldown=BREAKER_COOLDOWN)
+
+def _complete(model_id, messages):
+    """One chat completion on the pooled client; reports its latency or error to ROUTER (the caller caches the answer it uses)"""
+    start = time.perf_counter()
+
+    try:
+        response = get_client(model_id).chat_completion(messages, stream=False, **GENERATION_PARAMS)
+        content = response.choices[0].message.content
+    except Exception as e:
+        ROUTER.record(model_id, error=e)
+        raise
+
+    ROUTER.record(model_id, latency=time.perf_counter() - start)
+    return content
+
+def hedge_delay(model_id, first_token=False):
+    """
+    Seconds to wait on a tier before hedging: HF_HEDGE_DELAY if set, else the tier's median recent latency
+    (of whole answers, or of the first token when racing streams).
+    """
+    if HEDGE_DELAY:
+        return float(HEDGE_DELAY)
+    p50 = ROUTER.p50(model_id, first_token)
+    return DEFAULT_HEDGE_DELAY if p50 is None else p50
+
+# --- PERSISTENT RESPONSE CACHE ---
+# Shared by every worker process and kept across restarts, so a repeated prompt is neither re-billed nor re-waited.
+CACHE = ResponseCache(ttl=CACHE_TTL, max_entries=CACHE_SIZE) if CACHE_TTL > 0 else None
+
+def _cached(messages):
+    """Stored answer to these messages from the highest current tier that has one, or None"""
+    if CACHE is None:
+        return None
+    return CACHE.get(MODELS, messages[0]["content"], GENERATION_PARAMS)
+
+def _store(model_id, messages, content):
+    if CACHE is not None and content:
+        CACHE.put(model_id, messages[0]["content"], GENERATION_PARAMS, content)
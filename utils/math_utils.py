@@ -1,10 +1,13 @@
+import heapq
 import pandas as pd
 import numpy as np
 
-def calculate_key_metrics(df):
+def calculate_key_metrics(df, category_cols=None):
     """
     Returns a dictionary of key stats.
     Handles empty data, text-only data, and logic errors gracefully.
+    category_cols: low-cardinality text columns if already known (DatasetStats.category_columns()),
+    which skips the nunique() scan of every text column.
     """
     # 1. Safety Check: Is df empty?
     if df is None or df.empty:
@@ -24,11 +27,15 @@ def calculate_key_metrics(df):
     # 5. SMARTER LOGIC: Find the Real "Top Segment"
     # Old logic: Returned "Sales" (Column Name).
     # New logic: Finds the most frequent text value (e.g., "North").
-    text_df = df.select_dtypes(include=['object'])
+    # object, str/string and category columns (select_dtypes 'object' no longer covers pandas 3 'str' columns)
+    text_df = df.loc[:, [pd.api.types.is_string_dtype(dtype) or isinstance(dtype, pd.CategoricalDtype) for dtype in df.dtypes]]
     if not text_df.empty:
         # Find the text column with the fewest unique values (likely a Category like Region)
         # We avoid ID columns which have high cardinality
-        low_cardinality_cols = [col for col in text_df.columns if text_df[col].nunique() < len(df)/2]
+        if category_cols is not None:
+            low_cardinality_cols = [col for col in category_cols if col in text_df.columns]
+        else:
+            low_cardinality_cols = [col for col in text_df.columns if text_df[col].nunique() < len(df)/2]
         
         if low_cardinality_cols:
             target_col = low_cardinality_cols[0]
@@ -46,31 +53,146 @@ def calculate_key_metrics(df):
     }
     return summary
 
+def calculate_key_metrics_from_stats(stats):
+    """
+    Same dictionary as calculate_key_metrics, but built from whole-dataset
+    aggregates (StreamingIngestor stats / DatasetStats.to_dict()) instead of raw rows.
+    """
+    # 1. Safety Check: Nothing ingested or no numeric columns
+    if not stats or stats["rows"] == 0 or not stats["numeric"]:
+        return None
+
+    # 2. Basic Stats (same definitions as the row-based version)
+    sums = [entry["sum"] for entry in stats["numeric"].values()]
+    means = [entry["mean"] for entry in stats["numeric"].values() if entry["count"]]
+    total_val = max(sums)
+    avg_val = sum(means) / len(means) if means else 0.0
+
+    # 3. Top Segment: first low-cardinality text column, most frequent value
+    categories = stats["categories"]
+    if categories or stats["high_cardinality"]:
+        low_cardinality_cols = [col for col, freq in categories.items() if len(freq) < stats["rows"]/2 and freq]
+
+        if low_cardinality_cols:
+            freq = categories[low_cardinality_cols[0]]
+            top_segment = max(freq, key=freq.get)
+        else:
+            top_segment = "N/A"
+    else:
+        top_segment = "No Categories"
+
+    summary = {
+        "top_column": top_segment,
+        "total_value": total_val,
+        "average_value": avg_val
+    }
+    return summary
+
+def anomaly_column_stats(df, method="zscore"):
+    """
+    Returns {column: (center, scale)} for every numeric column, one column at a time.
+    zscore: mean / standard deviation. robust: median / MAD scaled to match std on normal data,
+    or 1.253314 * mean absolute deviation when more than half the values are equal (MAD = 0);
+    columns where that is 0 too have no outliers to score and are left out.
+    """
+    stats = {}
+    for col in df.select_dtypes(include=[np.number]).columns:
+        values = df[col].to_numpy(dtype=np.float64, na_value=np.nan)
+        values = values[~np.isnan(values)]
+        if values.size == 0:
+            continue
+
+        if method == "robust":
+            center = float(np.median(values))
+            deviations = np.abs(values - center)
+            scale = float(np.median(deviations)) * 1.4826
+            if scale == 0:
+                scale = float(deviations.mean()) * 1.253314
+                if scale == 0:
+                    continue
+        else:
+            center = float(values.mean())
+            scale = float(values.std(ddof=1)) if values.size > 1 else np.nan
+
+        # Avoid division by zero (constant columns)
+        stats[col] = (center, 1.0 if scale == 0 else scale)
+    return stats
+
+def _score_chunks(df, method, threshold, chunksize, column_stats):
+    """
+    Yields (start_row, columns, values, scores, hits) per chunk of rows, where hits marks the
+    cells whose |score| exceeds the threshold. Only one chunk of scores exists at a time.
+    """
+    if df is None or df.empty:
+        return
+
+    # 1. Centre/scale per column (z-score > 2.5 by default, modified z-score > 3.5 for robust)
+    if threshold is None:
+        threshold = 3.5 if method == "robust" else 2.5
+    if column_stats is None:
+        column_stats = anomaly_column_stats(df, method)
+
+    columns = [col for col in df.select_dtypes(include=[np.number]).columns if col in column_stats]
+    if not columns:
+        return
+
+    positions = df.columns.get_indexer(columns)
+    center = np.array([column_stats[col][0] for col in columns])
+    scale = np.array([column_stats[col][1] for col in columns])
+
+    # 2. Score one chunk at a time (a view of the rows, then one float block for the chunk)
+    for start in range(0, len(df), chunksize):
+        values = df.iloc[start:start + chunksize, positions].to_numpy(dtype=np.float64, na_value=np.nan)
+        scores = (values - center) / scale
+        with np.errstate(invalid="ignore"):
+            hits = np.abs(scores) > threshold
+        yield start, columns, values, scores, hits
+
+def iter_anomalies(df, method="zscore", threshold=None, chunksize=100_000, column_stats=None):
+    """
+    Yields (row_index, col_name, value, score) for every cell whose |score| exceeds the threshold,
+    in row order. Works through the numeric block `chunksize` rows at a time, so memory stays at
+    one chunk no matter how large the frame is.
+    column_stats: precomputed {column: (center, scale)}, e.g. from DatasetStats, to skip the stats pass.
+    """
+    for start, columns, values, scores, hits in _score_chunks(df, method, threshold, chunksize, column_stats):
+        rows, cols = np.nonzero(hits) # Row by row, like stack() did
+        for r, c in zip(rows, cols):
+            yield df.index[start + r], columns[c], values[r, c], scores[r, c]
+
+def scan_anomalies(df, top_k=10, method="zscore", threshold=None, chunksize=100_000, column_stats=None):
+    """
+    Returns the top_k most extreme cells as a list of {"row", "column", "value", "score"} dicts,
+    most extreme first. Keeps only a k-sized heap, never the full score matrix.
+    """
+    heap = []
+    for start, columns, values, scores, hits in _score_chunks(df, method, threshold, chunksize, column_stats):
+        rows, cols = np.nonzero(hits)
+        extremity = np.abs(scores[rows, cols])
+
+        # Only this chunk's own top_k can make it into the overall top_k
+        if len(extremity) > top_k:
+            keep = np.argpartition(-extremity, top_k - 1)[:top_k]
+            rows, cols, extremity = rows[keep], cols[keep], extremity[keep]
+
+        for r, c, e in zip(rows, cols, extremity):
+            entry = (e, -(start + r), -c, df.index[start + r], columns[c], values[r, c], scores[r, c]) # Earlier cells win ties
+            if len(heap) < top_k:
+                heapq.heappush(heap, entry)
+            elif entry[:3] > heap[0][:3]:
+                heapq.heapreplace(heap, entry)
+
+    return [
+        {"row": row, "column": col, "value": float(value), "score": float(score)}
+        for *_, row, col, value, score in sorted(heap, key=lambda entry: entry[:3], reverse=True)
+    ]
+
 def find_first_anomaly(df):
     """
     Returns the first row index and column name where a value is suspiciously low or high.
     """
-    if df is None or df.empty:
-        return None
-        
-    numeric_df = df.select_dtypes(include=[np.number])
-    if numeric_df.empty:
-        return None
-        
-    # We use Z-Score to find weird numbers (> 2.5 standard deviations)
-    # Using 'fill_value=0' avoids crashing on columns with standard dev = 0
-    stats = numeric_df.describe()
-    std_dev = stats.loc['std']
-    mean_val = stats.loc['mean']
-    
-    # Avoid division by zero
-    std_dev = std_dev.replace(0, 1) 
-    
-    z_scores = np.abs((numeric_df - mean_val) / std_dev)
-    outliers = (z_scores > 2.5).stack() 
-    
-    # Return first True value found
-    anomalies = outliers[outliers]
-    if not anomalies.empty:
-        return anomalies.index[0] # Returns tuple: (row_index, col_name)
-    return None
\ No newline at end of file
+    # Z-Score > 2.5 standard deviations, scanned chunk by chunk; stops at the first hit
+    first = next(iter_anomalies(df, method="zscore", threshold=2.5), None)
+    if first is not None:
+        return first[0], first[1] # Returns tuple: (row_index, col_name)
+    return None
@@ -0,0 +1,170 @@
+import time
+import threading
+from collections import deque
+
+# Latency histogram bucket edges (seconds) shown in the health table
+LATENCY_BUCKETS = [0.5, 1, 2, 5, 10, 20]
+
+class ModelRouter:
+    """
+    Picks the order in which the AI tiers are tried, from what they did recently.
+
+    Per model it keeps a rolling window of call outcomes and successful-call latencies (whole
+    completions and, separately, time to first token of streamed calls). A circuit
+    breaker opens after `failure_threshold` consecutive failures (or an error rate of `max_error_rate`
+    over a full-enough window): the model is skipped for `cooldown` seconds, then a single half-open
+    probe call decides whether it closes again or stays open for another cooldown.
+    Healthy models are ordered by median latency; models without enough samples keep their configured
+    priority behind the measured ones.
+    """
+
+    def __init__(self, models, window=50, failure_threshold=3, max_error_rate=0.5, cooldown=30.0, min_samples=5):
+        self.models = list(models)
+        self.window = window
+        self.failure_threshold = failure_threshold
+        self.max_error_rate = max_error_rate
+        self.cooldown = cooldown
+        self.min_samples = min_samples
+        self._lock = threading.Lock()
+        self._health = {model: self._new_health() for model in self.models}
+
+    def _new_health(self):
+        return {
+            "latencies": deque(maxlen=self.window), # seconds, successful complete calls only
+            "first_token": deque(maxlen=self.window), # seconds to the first token of successful streams
+            "outcomes": deque(maxlen=self.window),  # True = success
+            "consecutive_failures": 0,
+            "state": "closed",                      # closed | open | half_open
+            "opened_at": None,
+            "probing": False,                       # a half-open probe is in flight
+            "last_error": None
+        }
+
+    def _get(self, model):
+        if model not in self._health:
+            self._health[model] = self._new_health()
+        return self._health[model]
+
+    @staticmethod
+    def _median(values):
+        values = sorted(values)
+        return values[len(values) // 2] if values else None
+
+    def _p50(self, health, first_token=False):
+        latencies = health["first_token" if first_token else "latencies"]
+        return self._median(latencies) if len(latencies) >= self.min_samples else None
+
+    def order(self):
+        """Models in the order they should be tried now (open circuits still cooling down are left out)"""
+        now = time.monotonic()
+        with self._lock:
+            candidates = []
+            for priority, model in enumerate(self.models):
+                health = self._get(model)
+                if health["state"] == "open" and now - health["opened_at"] < self.cooldown:
+                    continue
+                if health["state"] == "half_open" and health["probing"]:
+                    continue
+                p50 = self._p50(health)
+                candidates.append((p50 is None, p50 or 0.0, priority, model))
+        return [model for *_, model in sorted(candidates)]
+
+    def allow(self, model):
+        """
+        Claim a call to `model`. An open circuit whose cooldown has passed turns half-open and lets
+        exactly one probe through; everyone else is refused until that probe reports back.
+        """
+        with self._lock:
+            health = self._get(model)
+            if health["state"] == "closed":
+                return True
+            if health["state"] == "open" and time.monotonic() - health["opened_at"] >= self.cooldown:
+                health["state"] = "half_open"
+            if health["state"] == "half_open" and not health["probing"]:
+                health["probing"] = True
+                return True
+            return False
+
+    def release(self, model):
+        """Give back a claim whose call never ran (e.g. a cancelled hedge)"""
+        with self._lock:
+            self._get(model)["probing"] = False
+
+    def record(self, model, latency=None, error=None, first_token=False):
+        """
+        Report a finished call: its latency on success, or the exception it failed with.
+        For streamed calls pass first_token=True with the time to the first token, kept apart from
+        complete-call latencies so reading and drawing the rest of the stream never counts against the model.
+        """
+        with self._lock:
+            health = self._get(model)
+            health["probing"] = False
+
+            if error is None:
+                health["first_token" if first_token else "latencies"].append(latency)
+                health["outcomes"].append(True)
+                health["consecutive_failures"] = 0
+                health["state"] = "closed"
+                return
+
+            health["outcomes"].append(False)
+            health["consecutive_failures"] += 1
+            health["last_error"] = str(error)[:200]
+
+            outcomes = health["outcomes"]
+            error_rate = outcomes.count(False) / len(outcomes)
+            if (health["state"] == "half_open"
+                    or health["consecutive_failures"] >= self.failure_threshold
+                    or (len(outcomes) >= self.min_samples * 2 and error_rate >= self.max_error_rate)):
+                health["state"] = "open"
+                health["opened_at"] = time.monotonic()
+
+    def p50(self, model, first_token=False):
+        """Median latency of recent successful calls, or their time to first token (None until min_samples exist)"""
+        with self._lock:
+            return self._p50(self._get(model), first_token)
+
+    def snapshot(self):
+        """One row per model: breaker state, why it is skipped, latency quantiles and histogram, error rate"""
+        now = time.monotonic()
+        ranks = {model: rank for rank, model in enumerate(self.order(), start=1)}
+
+        rows = []
+        with self._lock:
+            for model, health in self._health.items():
+                latencies = sorted(health["latencies"])
+                outcomes = health["outcomes"]
+                retry_in = None
+                if health["state"] == "open":
+                    retry_in = max(0.0, self.cooldown - (now - health["opened_at"]))
+
+                if model in ranks:
+                    reason = "probe pending" if health["state"] != "closed" else ""
+                elif health["state"] == "open":
+                    reason = f"circuit open after {health['consecutive_failures']} failure(s); retry in {retry_in:.0f}s"
+                else:
+                    reason = "half-open probe in flight"
+
+                histogram, start = {}, 0
+                for edge in LATENCY_BUCKETS + [float("inf")]:
+                    end = start
+                    while end < len(latencies) and latencies[end] <= edge:
+                        end += 1
+                    histogram[f"≤{edge:g}s" if edge != float("inf") else f">{LATENCY_BUCKETS[-1]:g}s"] = end - start
+                    start = end
+
+                rows.append({
+                    "model": model,
+                    "rank": ranks.get(model),
+                    "state": health["state"],
+                    "skipped_because": reason,
+                    "p50_s": latencies[len(latencies) // 2] if latencies else None,
+                    "p95_s": latencies[int(0.95 * (len(latencies) - 1))] if latencies else None,
+                    "ttft_p50_s": self._median(health["first_token"]),
+                    "error_rate": outcomes.count(False) / len(outcomes) if outcomes else 0.0,
+                    "calls": len(outcomes),
+                    "consecutive_failures": health["consecutive_failures"],
+                    "last_error": health["last_error"],
+                    "latency_histogram": histogram
+                })
+        return rows
@@ -0,0 +1,167 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+
+class ResponseCache:
+    """
+    Disk-backed cache of LLM answers shared by every worker process on the machine (one SQLite file).
+
+    Entries are keyed by the model that answered plus a hash of the normalised prompt and the
+    generation parameters, expire after `ttl` seconds, and the least recently used ones are evicted
+    beyond `max_entries`. SQLite runs in WAL mode with a busy timeout so several processes can read
+    and write concurrently. Lookups are plain reads: hit/miss counters and access times are buffered
+    in memory and written in one transaction every `flush_every` lookups (and on put/stats).
+    The cache is best effort: any database error counts as a miss, and a failed flush is dropped.
+    """
+
+    def __init__(self, path=None, ttl=24 * 3600, max_entries=5000, flush_every=50):
+        cache_dir = os.getenv("ORBIT_CACHE_DIR", ".orbit_cache")
+        self.path = path or os.path.join(cache_dir, "ai_responses.sqlite3")
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._local = threading.local() # sqlite3 connections must stay on their thread
+        self._schema_ready = False
+        self.flush_every = flush_every
+        self._pending_lock = threading.Lock()
+        self._pending_counts = {}  # counter name -> increments not yet written
+        self._pending_access = {}  # (model, prompt_key) -> last access time not yet written
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None and self._local.pid == os.getpid():
+            return conn
+
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None) # autocommit; explicit BEGIN for writes
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        if not self._schema_ready:
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS responses (
+                    model TEXT NOT NULL,
+                    prompt_key TEXT NOT NULL,
+                    response TEXT NOT NULL,
+                    created REAL NOT NULL,
+                    accessed REAL NOT NULL,
+                    PRIMARY KEY (model, prompt_key)
+                );
+                CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed);
+                CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value INTEGER NOT NULL);
+            """)
+            self._schema_ready = True
+
+        self._local.conn, self._local.pid = conn, os.getpid() # a forked worker reopens its own connection
+        return conn
+
+    @staticmethod
+    def prompt_key(prompt, params):
+        """Hash of the prompt with whitespace normalised and the generation parameters (order-independent)"""
+        normalised = " ".join(prompt.split())
+        payload = json.dumps({"prompt": normalised, "params": params}, sort_keys=True)
+        return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+
+    def _flush(self, conn):
+        """Write the buffered counters and access times; must run inside a write transaction"""
+        with self._pending_lock:
+            counts, self._pending_counts = self._pending_counts, {}
+            access, self._pending_access = self._pending_access, {}
+
+        conn.executemany("INSERT INTO counters (name, value) VALUES (?, ?) "
+                         "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value", list(counts.items()))
+        conn.executemany("UPDATE responses SET accessed = MAX(accessed, ?) WHERE model = ? AND prompt_key = ?",
+                         [(accessed, model, key) for (model, key), accessed in access.items()])
+
+    def flush(self):
+        """Write the buffered counters and access times now (best effort)"""
+        try:
+            conn = self._connect()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._flush(conn)
+                conn.execute("COMMIT")
+            except sqlite3.Error:
+                conn.execute("ROLLBACK")
+                raise
+        except (sqlite3.Error, OSError) as e:
+            print(f"⚠️ Response cache unavailable: {e}")
+
+    def get(self, models, prompt, params):
+        """
+        Unexpired answer to this prompt from the first of `models` (in the order given) that has one,
+        or None on a miss. Never takes the write lock itself.
+        """
+        key = self.prompt_key(prompt, params)
+        now = time.time()
+        models = list(models)
+        try:
+            conn = self._connect()
+            placeholders = ",".join("?" * len(models))
+            row = conn.execute(
+                f"SELECT model, response FROM responses WHERE prompt_key = ? AND created >= ? "
+                f"AND model IN ({placeholders}) ORDER BY instr(?, '|' || model || '|'), created DESC LIMIT 1",
+                [key, now - self.ttl] + models + ["|" + "|".join(models) + "|"]
+            ).fetchone()
+        except (sqlite3.Error, OSError) as e:
+            print(f"⚠️ Response cache unavailable: {e}")
+            return None
+
+        with self._pending_lock:
+            name = "hits" if row is not None else "misses"
+            self._pending_counts[name] = self._pending_counts.get(name, 0) + 1
+            if row is not None:
+                self._pending_access[(row[0], key)] = now
+            due = sum(self._pending_counts.values()) >= self.flush_every
+        if due:
+            self.flush()
+        return row[1] if row is not None else None
+
+    def put(self, model, prompt, params, response):
+        """Store an answer, then drop expired entries and the least recently used beyond max_entries"""
+        key = self.prompt_key(prompt, params)
+        now = time.time()
+        try:
+            conn = self._connect()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._flush(conn) # recent accesses first, so eviction sees them
+                conn.execute("INSERT OR REPLACE INTO responses (model, prompt_key, response, created, accessed) "
+                             "VALUES (?, ?, ?, ?, ?)", (model, key, response, now, now))
+                conn.execute("DELETE FROM responses WHERE created < ?", (now - self.ttl,))
+                conn.execute("DELETE FROM responses WHERE rowid IN "
+                             "(SELECT rowid FROM responses ORDER BY accessed DESC LIMIT -1 OFFSET ?)", (self.max_entries,))
+                conn.execute("COMMIT")
+            except sqlite3.Error:
+                conn.execute("ROLLBACK")
+                raise
+        except (sqlite3.Error, OSError) as e:
+            print(f"⚠️ Response cache unavailable: {e}")
+
+    def stats(self):
+        """Hit/miss counters (across all processes) and the current number of entries"""
+        self.flush()
+        try:
+            conn = self._connect()
+            counters = dict(conn.execute("SELECT name, value FROM counters").fetchall())
+            entries = conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        except (sqlite3.Error, OSError) as e:
+            print(f"⚠️ Response cache unavailable: {e}")
+            counters, entries = {}, 0
+
+        hits, misses = counters.get("hits", 0), counters.get("misses", 0)
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / (hits + misses) if hits + misses else 0.0,
+            "entries": entries
+        }
+
+    def clear(self):
+        """Drop every entry and reset the counters"""
+        with self._pending_lock:
+            self._pending_counts, self._pending_access = {}, {}
+        conn = self._connect()
+        conn.execute("DELETE FROM responses")
+        conn.execute("DELETE FROM counters")
@@ -152,4 +152,23 @@ def text_card(title, content):
         </h3>
         <div style="font-family: 'Roboto', sans-serif;">{content}</div>
     </div>
-    """, unsafe_allow_html=True)
\ No newline at end of file
+    """, unsafe_allow_html=True)
+
+def stream_text_card(title, chunks, placeholder=None, refresh=0.05):
+    """
+    text_card that fills in as `chunks` (text deltas) arrive, redrawn at most every `refresh` seconds.
+    Whatever the placeholder holds (e.g. a skeleton loader) stays until the first chunk.
+    Returns the full text.
+    """
+    placeholder = placeholder if placeholder is not None else st.empty()
+    text, drawn = "", 0.0
+    for chunk in chunks:
+        text += chunk
+        if time.perf_counter() - drawn >= refresh:
+            with placeholder.container():
+                text_card(title, text + " ▌")
+            drawn = time.perf_counter()
+
+    with placeholder.container():
+        text_card(title, text)
+    return text